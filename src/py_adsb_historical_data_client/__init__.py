@@ -11,16 +11,22 @@ from .cache import (
 from .historical import (
     ADSBClientError,
     DownloadError,
+    FullHeatmapBatch,
     FullHeatmapEntry,
     HTTPError,
     TraceSession,
     download_heatmap,
+    download_heatmaps_batch,
     download_traces,
+    download_traces_batch,
     get_heatmap,
+    get_heatmap_batch,
     get_heatmap_entries,
     get_traces,
+    get_traces_filtered,
     get_zoned_heatmap_entries,
     haversine_distance,
+    haversine_distance_batch,
     is_valid_location,
 )
 from .logger_config import get_logger, setup_logger
@@ -43,15 +49,21 @@ __all__ = [
     "get_logger",
     # Heatmap functions
     "download_heatmap",
+    "download_heatmaps_batch",
     "get_heatmap",
+    "get_heatmap_batch",
     "get_heatmap_entries",
     "get_zoned_heatmap_entries",
     "FullHeatmapEntry",
+    "FullHeatmapBatch",
     # Trace functions
     "download_traces",
+    "download_traces_batch",
     "get_traces",
+    "get_traces_filtered",
     # Utilities
     "haversine_distance",
+    "haversine_distance_batch",
     "is_valid_location",
     # Re-exports from pyreadsb
     "TraceEntry",
@@ -0,0 +1,31 @@
+"""
+Helpers building the path fragments shared by the download URLs and the cache layout.
+"""
+
+from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def date_path(year: int, month: int, day: int) -> str:
+    """
+    Get the "YYYY/MM/DD" path fragment of a date.
+
+    Results are memoized, as bulk downloads and cache lookups hit the same few days repeatedly.
+
+    :param year: The year of the date.
+    :param month: The month of the date.
+    :param day: The day of the date.
+    :return: The date path fragment, e.g. "2023/06/15".
+    """
+    return f"{year:04d}/{month:02d}/{day:02d}"
+
+
+def heatmap_slot(timestamp: datetime) -> int:
+    """
+    Get the index of the 30-minute heatmap slot of a timestamp within its day.
+
+    :param timestamp: The timestamp to get the slot of.
+    :return: The slot index, from 0 to 47.
+    """
+    return timestamp.hour * 2 + (timestamp.minute >= 30)
@@ -5,16 +5,135 @@ This module provides a file-based caching mechanism to avoid redundant downloads
 of heatmap and trace data from the ADSB Exchange historical data API.
 """
 
+import contextlib
+import mmap
+import os
 import shutil
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
 from datetime import datetime
 from logging import Logger
 from pathlib import Path
-from typing import Final
+from typing import Final, Literal, overload
 
+from ._paths import date_path, heatmap_slot
 from .logger_config import get_logger
 
+try:
+    import zstandard
+except ImportError:
+    ZSTD_AVAILABLE = False
+else:
+    ZSTD_AVAILABLE = True
+
 logger: Logger = get_logger(__name__)
 
+# Default size budget of the in-memory heatmap layer of a Cache
+DEFAULT_MEMORY_CACHE_MAX_BYTES: Final[int] = 256 * 1024 * 1024
+
+# Files at least this large are memory-mapped when read as a memoryview; smaller ones
+# are cheaper to read outright than to map.
+_MMAP_MIN_SIZE: Final[int] = 64 * 1024
+
+# Compression level of the cached traces: trace JSON shrinks several-fold at level 3,
+# and decompressing it is far cheaper than reading the uncompressed file from disk.
+_TRACE_ZSTD_LEVEL: Final[int] = 3
+_ZSTD_SUFFIX: Final[str] = ".zst"
+
+
+_HeatmapKey = tuple[int, int, int, int]
+_TraceKey = tuple[str, int, int, int]
+
+
+class _CacheIndex:
+    """
+    The keys and sizes of the entries stored in a cache directory, in least recently used order.
+    """
+
+    __slots__ = ("heatmaps", "traces", "heatmap_size", "trace_size", "recency")
+
+    def __init__(self) -> None:
+        # Entry sizes keyed by (year, month, day, half-hour slot) and (icao, year, month, day)
+        self.heatmaps: dict[_HeatmapKey, int] = {}
+        self.traces: dict[_TraceKey, int] = {}
+        self.heatmap_size = 0
+        self.trace_size = 0
+        # All the keys, least recently used first. Trace keys are the ones starting with a string.
+        self.recency: OrderedDict[_HeatmapKey | _TraceKey, None] = OrderedDict()
+
+    @property
+    def total_size(self) -> int:
+        return self.heatmap_size + self.trace_size
+
+    def put_heatmap(self, key: _HeatmapKey, size: int) -> None:
+        self.heatmap_size += size - self.heatmaps.get(key, 0)
+        self.heatmaps[key] = size
+        self.recency[key] = None
+        self.recency.move_to_end(key)
+
+    def put_trace(self, key: _TraceKey, size: int) -> None:
+        self.trace_size += size - self.traces.get(key, 0)
+        self.traces[key] = size
+        self.recency[key] = None
+        self.recency.move_to_end(key)
+
+    def size(self, key: _HeatmapKey | _TraceKey) -> int:
+        """Get the size of an indexed entry."""
+        if isinstance(key[0], str):
+            return self.traces[key]
+        return self.heatmaps[key]
+
+    def remove(self, key: _HeatmapKey | _TraceKey) -> None:
+        """Remove an entry from the index."""
+        del self.recency[key]
+        if isinstance(key[0], str):
+            self.trace_size -= self.traces.pop(key)
+        else:
+            self.heatmap_size -= self.heatmaps.pop(key)
+
+    @classmethod
+    def scan(cls, cache_path: str) -> "_CacheIndex":
+        """
+        Build the index of a cache directory from its heatmaps/YYYY/MM/DD and traces/YYYY/MM/DD/XX layout.
+
+        Entries are ordered by modification time, as the best guess of their recency.
+        :param cache_path: The root of the cache directory.
+        :return: The index of the entries found.
+        """
+        found: list[tuple[float, _HeatmapKey | _TraceKey, int]] = []
+        for year, month, day, day_path in _iter_day_dirs(f"{cache_path}/heatmaps"):
+            for entry in _scandir(day_path):
+                slot = entry.name.removesuffix(".bin.ttf")
+                if slot != entry.name and slot.isdigit() and entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    found.append((stat.st_mtime, (year, month, day, int(slot)), stat.st_size))
+        for year, month, day, day_path in _iter_day_dirs(f"{cache_path}/traces"):
+            for sub_folder in _scandir(day_path):
+                if not sub_folder.is_dir(follow_symlinks=False):
+                    continue
+                for entry in _scandir(sub_folder.path):
+                    name = entry.name
+                    # Compressed traces cannot be read without zstandard, so they are not indexed then
+                    if ZSTD_AVAILABLE:
+                        name = name.removesuffix(_ZSTD_SUFFIX)
+                    if (
+                        name.startswith("trace_full_")
+                        and name.endswith(".json")
+                        and entry.is_file(follow_symlinks=False)
+                    ):
+                        stat = entry.stat(follow_symlinks=False)
+                        found.append((stat.st_mtime, (name[11:-5], year, month, day), stat.st_size))
+
+        index = cls()
+        found.sort(key=lambda item: item[0])
+        for _, key, size in found:
+            if isinstance(key[0], str):
+                index.put_trace(key, size)
+            else:
+                index.put_heatmap(key, size)
+        return index
+
 
 class Cache:
     """
@@ -22,7 +141,20 @@ class Cache:
 
     The cache stores files in a structured directory hierarchy:
     - heatmaps: {cache_path}/heatmaps/{YYYY}/{MM}/{DD}/{filename}.bin.ttf
-    - traces: {cache_path}/traces/{YYYY}/{MM}/{DD}/{subfolder}/{filename}.json
+    - traces: {cache_path}/traces/{YYYY}/{MM}/{DD}/{subfolder}/{filename}.json[.zst]
+
+    With compress_traces, traces are stored zstd-compressed with a .zst suffix, using the
+    optional zstandard package. Uncompressed .json traces are still read, so existing caches keep working.
+
+    Recently used heatmaps are also kept in memory, in an LRU bounded by their total
+    size, so repeated reads of the same heatmaps within a process skip the filesystem.
+
+    The keys and sizes of the cached entries are indexed in memory, from a scan of the
+    cache directory on first use, so has_heatmap, has_trace and get_cache_stats do not
+    touch the disk. Call refresh() after the directory is modified by another process.
+
+    The cache grows without bound by default. With max_size_bytes set, the least recently
+    used entries are deleted whenever a put takes the cache over that size.
 
     Example:
         cache = Cache("/path/to/cache")
@@ -35,15 +167,43 @@ class Cache:
             cache.put_heatmap(timestamp, data)
     """
 
-    def __init__(self, cache_path: str | Path) -> None:
+    def __init__(
+        self,
+        cache_path: str | Path,
+        memory_cache_max_bytes: int = DEFAULT_MEMORY_CACHE_MAX_BYTES,
+        max_size_bytes: int | None = None,
+        compress_traces: bool = False,
+    ) -> None:
         """
         Initialize the cache.
 
         :param cache_path: The path to the cache directory.
                           Will be created if it doesn't exist.
+        :param memory_cache_max_bytes: The maximum total size of the heatmaps kept in memory.
+                                       Set to 0 to disable the in-memory layer.
+        :param max_size_bytes: The maximum total size of the cached files, beyond which the
+                               least recently used ones are evicted. None for no limit.
+        :param compress_traces: Store the traces zstd-compressed, which requires the zstandard package.
+                                Compressed traces can only be read back where zstandard is installed.
         """
+        if compress_traces and not ZSTD_AVAILABLE:
+            raise ImportError(
+                "Compressing traces requires zstandard: pip install 'py-adsb-historical-data-client[zstd]'"
+            )
         self._cache_path = Path(cache_path)
         self._cache_path.mkdir(parents=True, exist_ok=True)
+        # Plain string root, joined with f-strings on the hot lookup paths
+        self._cache_path_str = str(self._cache_path)
+        # In-memory LRU of heatmaps, keyed by (year, month, day, half-hour slot) and evicted by size
+        self._memory_cache: OrderedDict[_HeatmapKey, bytes] = OrderedDict()
+        self._memory_cache_bytes = 0
+        self._memory_cache_max_bytes = memory_cache_max_bytes
+        self._memory_cache_lock = threading.Lock()
+        # Index of the cached entries, scanned from disk on first use then kept up to date by put/clear
+        self._index: _CacheIndex | None = None
+        self._index_lock = threading.Lock()
+        self._max_size_bytes = max_size_bytes
+        self._compress_traces = compress_traces
         logger.info(f"Cache initialized at {self._cache_path}")
 
     @property
@@ -51,18 +211,185 @@ class Cache:
         """Return the cache directory path."""
         return self._cache_path
 
-    def _get_heatmap_path(self, timestamp: datetime) -> Path:
+    def _get_heatmap_path(self, timestamp: datetime) -> str:
         """Get the cache file path for a heatmap."""
-        date_path = timestamp.strftime("%Y/%m/%d")
-        filename: Final[int] = timestamp.hour * 2 + (timestamp.minute // 30)
-        return self._cache_path / "heatmaps" / date_path / f"{filename}.bin.ttf"
+        date_str: Final[str] = date_path(timestamp.year, timestamp.month, timestamp.day)
+        filename: Final[int] = heatmap_slot(timestamp)
+        return f"{self._cache_path_str}/heatmaps/{date_str}/{filename}.bin.ttf"
 
-    def _get_trace_path(self, icao: str, timestamp: datetime) -> Path:
+    def _get_trace_path(self, icao: str, timestamp: datetime) -> str:
         """Get the cache file path for a trace."""
-        date_path = timestamp.strftime("%Y/%m/%d")
-        sub_folder: Final[str] = icao.lower()[-2:]
-        filename: Final[str] = f"trace_full_{icao.lower()}.json"
-        return self._cache_path / "traces" / date_path / sub_folder / filename
+        date_str: Final[str] = date_path(timestamp.year, timestamp.month, timestamp.day)
+        icao_lower: Final[str] = icao.lower()
+        sub_folder: Final[str] = icao_lower[-2:]
+        filename: Final[str] = f"trace_full_{icao_lower}.json"
+        return f"{self._cache_path_str}/traces/{date_str}/{sub_folder}/{filename}"
+
+    def _get_key_path(self, key: _HeatmapKey | _TraceKey) -> str:
+        """Get the cache file path of an indexed entry."""
+        if isinstance(key[0], str):
+            icao, year, month, day = key
+            return f"{self._cache_path_str}/traces/{date_path(year, month, day)}/{icao[-2:]}/trace_full_{icao}.json"
+        year, month, day, slot = key
+        return f"{self._cache_path_str}/heatmaps/{date_path(year, month, day)}/{slot}.bin.ttf"
+
+    @staticmethod
+    def _get_heatmap_key(timestamp: datetime) -> _HeatmapKey:
+        """Get the in-memory cache key of a heatmap."""
+        return (timestamp.year, timestamp.month, timestamp.day, heatmap_slot(timestamp))
+
+    @staticmethod
+    def _get_trace_key(icao: str, timestamp: datetime) -> _TraceKey:
+        """Get the index key of a trace."""
+        return (icao.lower(), timestamp.year, timestamp.month, timestamp.day)
+
+    def _get_index(self) -> _CacheIndex:
+        """Get the index of the cached entries, scanning the cache directory if needed. Requires _index_lock."""
+        if self._index is None:
+            self._index = _CacheIndex.scan(self._cache_path_str)
+        return self._index
+
+    def _get_memory_heatmap(self, key: _HeatmapKey) -> bytes | None:
+        """Get a heatmap from the in-memory cache, marking it as most recently used."""
+        with self._memory_cache_lock:
+            data = self._memory_cache.get(key)
+            if data is not None:
+                self._memory_cache.move_to_end(key)
+            return data
+
+    def _put_memory_heatmap(self, key: _HeatmapKey, data: bytes) -> None:
+        """Store a heatmap in the in-memory cache, evicting the least recently used ones to fit."""
+        if len(data) > self._memory_cache_max_bytes:
+            return
+        with self._memory_cache_lock:
+            previous = self._memory_cache.pop(key, None)
+            if previous is not None:
+                self._memory_cache_bytes -= len(previous)
+            self._memory_cache[key] = data
+            self._memory_cache_bytes += len(data)
+            while self._memory_cache_bytes > self._memory_cache_max_bytes:
+                _, evicted = self._memory_cache.popitem(last=False)
+                self._memory_cache_bytes -= len(evicted)
+
+    @staticmethod
+    def _read_file(path: str) -> bytes | None:
+        """Read a cached file, or return None if it doesn't exist."""
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _read_file_view(path: str) -> memoryview | None:
+        """
+        Read a cached file as a memoryview, or return None if it doesn't exist.
+
+        Files of at least _MMAP_MIN_SIZE bytes are memory-mapped read-only instead of
+        being copied, the map being released along with the last view on it.
+        """
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < _MMAP_MIN_SIZE:
+                    return memoryview(f.read())
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _atomic_write_path(path: str) -> Iterator[str]:
+        """
+        Get a temporary path to write a cached file to, creating its parent directories if needed.
+
+        Once the caller is done writing, the temporary file is renamed over the target, so
+        readers never see a partially written file, even if the process dies mid-write or
+        several writers store the same entry concurrently.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        try:
+            yield tmp_path
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def _write_file(cls, path: str, data: bytes) -> None:
+        """Atomically write a cached file, with raw os.write calls rather than a buffered file object."""
+        with cls._atomic_write_path(path) as tmp_path:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view) :]
+            finally:
+                os.close(fd)
+
+    def _index_put(self, key: _HeatmapKey | _TraceKey, size: int) -> None:
+        """Record a stored entry in the index, evicting the least recently used entries if over budget."""
+        with self._index_lock:
+            if self._max_size_bytes is None:
+                # Not scanned yet: the first scan will find the file on disk
+                if self._index is None:
+                    return
+                index = self._index
+            else:
+                index = self._get_index()
+
+            if isinstance(key[0], str):
+                index.put_trace(key, size)
+            else:
+                index.put_heatmap(key, size)
+
+            if self._max_size_bytes is not None:
+                excess = index.total_size - self._max_size_bytes
+                # Least recently used first, so only the evicted entries are visited. The entry just stored
+                # is always kept, even if it exceeds the budget on its own, and entries whose file cannot
+                # be deleted stay indexed. The index is only updated after the walk over its recency order.
+                evicted: list[_HeatmapKey | _TraceKey] = []
+                for candidate in index.recency:
+                    if excess <= 0:
+                        break
+                    if candidate != key and self._evict(candidate):
+                        evicted.append(candidate)
+                        excess -= index.size(candidate)
+                for candidate in evicted:
+                    index.remove(candidate)
+
+    def _evict(self, key: _HeatmapKey | _TraceKey) -> bool:
+        """
+        Delete the file of an entry, to remove it from the index. Requires _index_lock.
+
+        :return: False if the file could not be deleted, e.g. while it is memory-mapped on Windows.
+        """
+        path = self._get_key_path(key)
+        paths = (path, path + _ZSTD_SUFFIX) if isinstance(key[0], str) else (path,)
+        try:
+            for variant in paths:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(variant)
+        except OSError as e:
+            logger.warning(f"Could not evict cache entry {path}: {e}")
+            return False
+        if not isinstance(key[0], str):
+            with self._memory_cache_lock:
+                evicted = self._memory_cache.pop(key, None)
+                if evicted is not None:
+                    self._memory_cache_bytes -= len(evicted)
+        logger.debug(f"Evicted least recently used cache entry: {path}")
+        return True
+
+    def _touch(self, key: _HeatmapKey | _TraceKey) -> None:
+        """Mark an entry as most recently used, when the cache size is bounded."""
+        if self._max_size_bytes is None:
+            return
+        with self._index_lock:
+            recency = self._get_index().recency
+            if key in recency:
+                recency.move_to_end(key)
 
     def has_heatmap(self, timestamp: datetime) -> bool:
         """
@@ -71,26 +398,90 @@ class Cache:
         :param timestamp: The timestamp of the heatmap.
         :return: True if the heatmap is cached, False otherwise.
         """
-        path = self._get_heatmap_path(timestamp)
-        exists = path.exists()
+        key = self._get_heatmap_key(timestamp)
+        with self._index_lock:
+            exists = key in self._get_index().heatmaps
         if exists:
             logger.debug(f"Cache hit for heatmap at {timestamp}")
         return exists
 
-    def get_heatmap(self, timestamp: datetime) -> bytes | None:
+    @overload
+    def get_heatmap(self, timestamp: datetime, as_memoryview: Literal[False] = False) -> bytes | None: ...
+
+    @overload
+    def get_heatmap(self, timestamp: datetime, as_memoryview: Literal[True]) -> memoryview | None: ...
+
+    def get_heatmap(self, timestamp: datetime, as_memoryview: bool = False) -> bytes | memoryview | None:
         """
         Get a cached heatmap.
 
         :param timestamp: The timestamp of the heatmap.
-        :return: The heatmap data as bytes, or None if not cached.
+        :param as_memoryview: Return a memoryview instead of bytes. Heatmaps not held in memory
+                              are then memory-mapped rather than copied when large enough.
+        :return: The heatmap data as bytes (or a memoryview), or None if not cached.
         """
+        key = self._get_heatmap_key(timestamp)
+        data = self._get_memory_heatmap(key)
+        if data is not None:
+            logger.debug(f"Reading heatmap from memory cache at {timestamp}")
+            self._touch(key)
+            return memoryview(data) if as_memoryview else data
+
         path = self._get_heatmap_path(timestamp)
-        try:
-            data = path.read_bytes()
+        if as_memoryview:
+            view = self._read_file_view(path)
+            if view is not None:
+                logger.debug(f"Reading heatmap view from cache: {path}")
+                self._touch(key)
+            return view
+
+        data = self._read_file(path)
+        if data is not None:
             logger.debug(f"Reading heatmap from cache: {path}")
-            return data
+            self._put_memory_heatmap(key, data)
+            self._touch(key)
+        return data
+
+    def get_heatmap_mmap(self, timestamp: datetime) -> mmap.mmap | None:
+        """
+        Get a cached heatmap as a read-only memory map.
+
+        Unlike get_heatmap, the file is not copied into a new bytes object: its pages are
+        served from the OS page cache as they are accessed. The caller must close the map.
+
+        :param timestamp: The timestamp of the heatmap.
+        :return: The memory-mapped heatmap file, or None if not cached or empty.
+        """
+        path = self._get_heatmap_path(timestamp)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
         except FileNotFoundError:
             return None
+        except ValueError:
+            # Empty files cannot be mapped
+            return None
+        logger.debug(f"Mapping heatmap from cache: {path}")
+        self._touch(self._get_heatmap_key(timestamp))
+        return mapped
+
+    def get_heatmap_buffer(self, timestamp: datetime) -> bytes | mmap.mmap | None:
+        """
+        Get a cached heatmap without copying it.
+
+        Heatmaps held in memory are returned as they are; the others are memory-mapped
+        as with get_heatmap_mmap, in which case the caller must close the map.
+
+        :param timestamp: The timestamp of the heatmap.
+        :return: The heatmap data as bytes or as a memory map, or None if not cached or empty.
+        """
+        key = self._get_heatmap_key(timestamp)
+        data = self._get_memory_heatmap(key)
+        if data is not None:
+            logger.debug(f"Reading heatmap from memory cache at {timestamp}")
+            self._touch(key)
+            return data
+        return self.get_heatmap_mmap(timestamp)
 
     def put_heatmap(self, timestamp: datetime, data: bytes) -> None:
         """
@@ -100,10 +491,35 @@ class Cache:
         :param data: The heatmap data as bytes.
         """
         path = self._get_heatmap_path(timestamp)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_bytes(data)
+        key = self._get_heatmap_key(timestamp)
+        self._write_file(path, data)
+        self._index_put(key, len(data))
+        self._put_memory_heatmap(key, data)
         logger.debug(f"Cached heatmap at {path} ({len(data)} bytes)")
 
+    def put_heatmap_stream(self, timestamp: datetime, chunks: Iterable[bytes]) -> bytes:
+        """
+        Store a heatmap received as a stream of chunks in the cache.
+
+        Each chunk is written to disk as it arrives and the complete heatmap is read back
+        once the stream ends, so only one full copy of it is ever held in memory.
+
+        :param timestamp: The timestamp of the heatmap.
+        :param chunks: The chunks of the heatmap data.
+        :return: The stored heatmap data as bytes.
+        """
+        path = self._get_heatmap_path(timestamp)
+        key = self._get_heatmap_key(timestamp)
+        with self._atomic_write_path(path) as tmp_path, open(tmp_path, "w+b") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.seek(0)
+            data = f.read()
+        self._index_put(key, len(data))
+        self._put_memory_heatmap(key, data)
+        logger.debug(f"Cached heatmap at {path} ({len(data)} bytes)")
+        return data
+
     def has_trace(self, icao: str, timestamp: datetime) -> bool:
         """
         Check if a trace is cached.
@@ -112,27 +528,43 @@ class Cache:
         :param timestamp: The timestamp (date) of the trace.
         :return: True if the trace is cached, False otherwise.
         """
-        path = self._get_trace_path(icao, timestamp)
-        exists = path.exists()
+        key = self._get_trace_key(icao, timestamp)
+        with self._index_lock:
+            exists = key in self._get_index().traces
         if exists:
             logger.debug(f"Cache hit for trace {icao} at {timestamp.date()}")
         return exists
 
-    def get_trace(self, icao: str, timestamp: datetime) -> bytes | None:
+    @overload
+    def get_trace(self, icao: str, timestamp: datetime, as_memoryview: Literal[False] = False) -> bytes | None: ...
+
+    @overload
+    def get_trace(self, icao: str, timestamp: datetime, as_memoryview: Literal[True]) -> memoryview | None: ...
+
+    def get_trace(self, icao: str, timestamp: datetime, as_memoryview: bool = False) -> bytes | memoryview | None:
         """
         Get a cached trace.
 
         :param icao: The ICAO code of the aircraft.
         :param timestamp: The timestamp (date) of the trace.
-        :return: The trace data as bytes, or None if not cached.
+        :param as_memoryview: Return a memoryview instead of bytes, memory-mapping the file
+                              rather than copying it when large enough.
+        :return: The trace data as bytes (or a memoryview), or None if not cached.
         """
         path = self._get_trace_path(icao, timestamp)
-        try:
-            data = path.read_bytes()
+        data: bytes | memoryview | None = None
+        if ZSTD_AVAILABLE:
+            compressed = self._read_file(path + _ZSTD_SUFFIX)
+            if compressed is not None:
+                data = zstandard.ZstdDecompressor().decompress(compressed)
+                if as_memoryview:
+                    data = memoryview(data)
+        if data is None:
+            data = self._read_file_view(path) if as_memoryview else self._read_file(path)
+        if data is not None:
             logger.debug(f"Reading trace from cache: {path}")
-            return data
-        except FileNotFoundError:
-            return None
+            self._touch(self._get_trace_key(icao, timestamp))
+        return data
 
     def put_trace(self, icao: str, timestamp: datetime, data: bytes) -> None:
         """
@@ -143,8 +575,17 @@ class Cache:
         :param data: The trace data as bytes.
         """
         path = self._get_trace_path(icao, timestamp)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_bytes(data)
+        stale_path = path
+        if self._compress_traces:
+            data = zstandard.ZstdCompressor(level=_TRACE_ZSTD_LEVEL).compress(data)
+            path += _ZSTD_SUFFIX
+        else:
+            stale_path += _ZSTD_SUFFIX
+        self._write_file(path, data)
+        # Drop the other variant of the trace, which would otherwise shadow or duplicate this one
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(stale_path)
+        self._index_put(self._get_trace_key(icao, timestamp), len(data))
         logger.debug(f"Cached trace at {path} ({len(data)} bytes)")
 
     def clear(self) -> None:
@@ -153,67 +594,112 @@ class Cache:
 
         Warning: This will delete all files in the cache directory.
         """
+        with self._memory_cache_lock:
+            self._memory_cache.clear()
+            self._memory_cache_bytes = 0
+        with self._index_lock:
+            self._index = None
         if self._cache_path.exists():
             shutil.rmtree(self._cache_path)
             self._cache_path.mkdir(parents=True, exist_ok=True)
             logger.info(f"Cache cleared at {self._cache_path}")
 
+    def refresh(self) -> None:
+        """
+        Drop the in-memory index of the cached entries, so it is rebuilt from the cache
+        directory on next use. Needed after the directory is modified outside of this instance.
+        """
+        with self._index_lock:
+            self._index = None
+
     def get_cache_size(self) -> int:
         """
         Get the total size of the cache in bytes.
 
         :return: The total size of all cached files in bytes.
         """
-        total_size = 0
-        for file_path in self._cache_path.rglob("*"):
-            if file_path.is_file():
-                total_size += file_path.stat().st_size
-        return total_size
+        return sum(entry.stat(follow_symlinks=False).st_size for entry in _iter_files(self._cache_path_str))
 
     def get_cache_stats(self) -> dict[str, int]:
         """
         Get statistics about the cache.
 
+        The statistics come from the in-memory index of the cached entries, so only the
+        first call scans the cache directory.
+
         :return: A dictionary with cache statistics.
         """
-        heatmap_count = 0
-        trace_count = 0
-        heatmap_size = 0
-        trace_size = 0
-
-        heatmaps_path = self._cache_path / "heatmaps"
-        traces_path = self._cache_path / "traces"
+        with self._index_lock:
+            index = self._get_index()
+            return {
+                "heatmap_count": len(index.heatmaps),
+                "trace_count": len(index.traces),
+                "heatmap_size_bytes": index.heatmap_size,
+                "trace_size_bytes": index.trace_size,
+                "total_size_bytes": index.heatmap_size + index.trace_size,
+            }
+
+
+def _iter_files(root: str) -> Iterator[os.DirEntry[str]]:
+    """
+    Recursively iterate over the files below a directory.
 
-        if heatmaps_path.exists():
-            for file_path in heatmaps_path.rglob("*.bin.ttf"):
-                if file_path.is_file():
-                    heatmap_count += 1
-                    heatmap_size += file_path.stat().st_size
+    Uses os.scandir, whose entries carry the file type (and on Windows the stat result)
+    from the directory listing, instead of issuing one stat call per file.
 
-        if traces_path.exists():
-            for file_path in traces_path.rglob("*.json"):
-                if file_path.is_file():
-                    trace_count += 1
-                    trace_size += file_path.stat().st_size
+    :param root: The directory to walk. A missing directory yields nothing.
+    :return: An iterator over the directory entries of the files.
+    """
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_files(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+    except FileNotFoundError:
+        return
+
+
+def _scandir(path: str) -> list[os.DirEntry[str]]:
+    """List a directory, or return an empty list if it doesn't exist."""
+    try:
+        with os.scandir(path) as it:
+            return list(it)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def _iter_day_dirs(root: str) -> Iterator[tuple[int, int, int, str]]:
+    """
+    Iterate over the YYYY/MM/DD day directories below a directory.
 
-        return {
-            "heatmap_count": heatmap_count,
-            "trace_count": trace_count,
-            "heatmap_size_bytes": heatmap_size,
-            "trace_size_bytes": trace_size,
-            "total_size_bytes": heatmap_size + trace_size,
-        }
+    :param root: The directory holding the year directories. A missing directory yields nothing.
+    :return: An iterator over the (year, month, day, path) of each day directory.
+    """
+    for year in _scandir(root):
+        if not (year.name.isdigit() and year.is_dir(follow_symlinks=False)):
+            continue
+        for month in _scandir(year.path):
+            if not (month.name.isdigit() and month.is_dir(follow_symlinks=False)):
+                continue
+            for day in _scandir(month.path):
+                if day.name.isdigit() and day.is_dir(follow_symlinks=False):
+                    yield int(year.name), int(month.name), int(day.name), day.path
 
 
 # Global cache instance (can be set by user)
 _global_cache: Cache | None = None
 
 
-def set_cache(cache_path: str | Path) -> Cache:
+def set_cache(cache_path: str | Path, max_size_bytes: int | None = None, compress_traces: bool = False) -> Cache:
     """
     Set the global cache path.
 
     :param cache_path: The path to the cache directory.
+    :param max_size_bytes: The maximum total size of the cached files, beyond which the
+                           least recently used ones are evicted. None for no limit.
+    :param compress_traces: Store the traces zstd-compressed, which requires the zstandard package.
     :return: The created Cache instance.
 
     Example:
@@ -223,7 +709,7 @@ def set_cache(cache_path: str | Path) -> Cache:
         # Now all downloads will be cached automatically
     """
     global _global_cache
-    _global_cache = Cache(cache_path)
+    _global_cache = Cache(cache_path, max_size_bytes=max_size_bytes, compress_traces=compress_traces)
     return _global_cache
 
 
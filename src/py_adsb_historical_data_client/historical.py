@@ -1,14 +1,26 @@
 # import pyreadsb
+import contextlib
 import math
-from collections.abc import Generator
+import mmap
+import threading
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from functools import lru_cache
 from logging import Logger
-from typing import TYPE_CHECKING, Final
+from typing import TYPE_CHECKING, Any, Final, cast, overload
 
+import numpy as np
+import numpy.typing as npt
 import requests
 from pyreadsb.heatmap_decoder import HeatmapDecoder
 from pyreadsb.traces_decoder import TraceEntry, process_traces_from_json_bytes
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
 
+from ._paths import date_path, heatmap_slot
 from .logger_config import get_logger
 
 if TYPE_CHECKING:
@@ -17,6 +29,21 @@ if TYPE_CHECKING:
 logger: Logger = get_logger(__name__)
 
 ADSBEXCHANGE_HISTORICAL_DATA_URL = "https://globe.adsbexchange.com/globe_history/"
+_HEATMAP_URL_TEMPLATE: Final[str] = ADSBEXCHANGE_HISTORICAL_DATA_URL + "{date}/heatmap/{slot}.bin.ttf"
+
+# Chunk size used to read streamed heatmap downloads. Heatmaps weigh several megabytes,
+# so 64 KiB chunks need far fewer intermediate buffers than requests' default 10 KiB.
+_DOWNLOAD_CHUNK_SIZE: Final[int] = 64 * 1024
+
+# Number of heatmap entries filtered per vectorized pass in get_zoned_heatmap_entries
+_ZONE_FILTER_CHUNK_SIZE: Final[int] = 4096
+
+# Below this radius (in meters), zones are filtered with the equirectangular approximation,
+# which stays within a meter of the haversine distance up to 60 degrees of latitude
+_FLAT_EARTH_MAX_RADIUS: Final[float] = 50_000.0
+
+# Length of one degree of latitude in meters, on the sphere used by the haversine formula
+_METERS_PER_DEGREE: Final[float] = 6371000.0 * math.pi / 180.0
 
 
 class ADSBClientError(Exception):
@@ -40,6 +67,70 @@ class HTTPError(DownloadError):
         super().__init__(message or f"HTTP {status_code} error for {url}")
 
 
+@lru_cache(maxsize=4096)
+def _heatmap_url(year: int, month: int, day: int, slot: int) -> str:
+    """
+    Get the download URL of a heatmap. Memoized, as retries and bulk downloads request the same slots again.
+
+    :param year: The year of the heatmap.
+    :param month: The month of the heatmap.
+    :param day: The day of the heatmap.
+    :param slot: The half-hour slot of the heatmap within its day.
+    :return: The heatmap URL.
+    """
+    return _HEATMAP_URL_TEMPLATE.format(date=date_path(year, month, day), slot=slot)
+
+
+def _download_one_heatmap(
+    session: requests.Session,
+    timestamp: datetime,
+    cache: "Cache | None",
+    timeout: float,
+) -> bytes:
+    """
+    Download the heatmap for a given timestamp with the given session.
+
+    :param session: The HTTP session to download with.
+    :param timestamp: The timestamp to download the heatmap for.
+    :param cache: The cache to read from and store into, or None to disable caching.
+    :param timeout: Request timeout in seconds.
+    :return: The heatmap data as bytes.
+    """
+    # Check cache first
+    if cache is not None:
+        cached_data = cache.get_heatmap(timestamp)
+        if cached_data is not None:
+            logger.debug(f"Using cached heatmap for {timestamp}")
+            return cached_data
+
+    url: Final[str] = _heatmap_url(timestamp.year, timestamp.month, timestamp.day, heatmap_slot(timestamp))
+
+    logger.info(f"Downloading heatmap from {url}")
+
+    try:
+        response: Final[requests.Response] = session.get(url, timeout=timeout, stream=True)
+        try:
+            if response.status_code == 200:
+                chunks = response.iter_content(_DOWNLOAD_CHUNK_SIZE)
+                if cache is not None:
+                    # Stream straight into the cache file rather than buffering the chunks first
+                    content = cache.put_heatmap_stream(timestamp, chunks)
+                else:
+                    content = b"".join(chunks)
+                logger.debug(f"Successfully downloaded heatmap, size: {len(content)} bytes")
+                return content
+            else:
+                error_msg = f"Failed to download heatmap {url}: {response.status_code}"
+                logger.error(error_msg)
+                raise HTTPError(url, response.status_code, error_msg)
+        finally:
+            # Streamed responses only release their connection once closed
+            response.close()
+    except requests.RequestException as e:
+        logger.error(f"Network error downloading heatmap from {url}: {e}")
+        raise DownloadError(f"Network error downloading heatmap from {url}: {e}") from e
+
+
 def download_heatmap(
     timestamp: datetime,
     timeout: float = 30.0,
@@ -59,38 +150,61 @@ def download_heatmap(
     # Use provided cache or fall back to global cache
     effective_cache = cache if cache is not None else get_cache()
 
-    # Check cache first
-    if effective_cache is not None:
-        cached_data = effective_cache.get_heatmap(timestamp)
-        if cached_data is not None:
-            logger.debug(f"Using cached heatmap for {timestamp}")
-            return cached_data
+    return _download_one_heatmap(_get_shared_session(), timestamp, effective_cache, timeout)
 
-    date_str: Final[str] = timestamp.strftime("%Y/%m/%d")
-    filename: Final[int] = timestamp.hour * 2 + (timestamp.minute // 30)
-    url: Final[str] = f"{ADSBEXCHANGE_HISTORICAL_DATA_URL}{date_str}/heatmap/{filename}.bin.ttf"
 
-    logger.info(f"Downloading heatmap from {url}")
+def download_heatmaps_batch(
+    timestamps: Iterable[datetime],
+    max_workers: int = 16,
+    cache: "Cache | None" = None,
+    timeout: float = 30.0,
+) -> dict[datetime, bytes]:
+    """
+    Download the heatmaps of many timestamps concurrently.
 
-    try:
-        response: Final[requests.Response] = requests.get(url, timeout=timeout)
+    The downloads are spread over a thread pool sharing one HTTP session whose
+    connection pool holds one connection per worker. Cached heatmaps are returned
+    without any request. The first failure cancels the downloads not started yet.
 
-        if response.status_code == 200:
-            content = response.content
-            logger.debug(f"Successfully downloaded heatmap, size: {len(content)} bytes")
+    Example:
+        start = datetime(2024, 8, 12)
+        heatmaps = download_heatmaps_batch(start + timedelta(minutes=30 * i) for i in range(48))
 
-            # Store in cache
-            if effective_cache is not None:
-                effective_cache.put_heatmap(timestamp, content)
+    :param timestamps: The timestamps to download the heatmaps for.
+    :param max_workers: The maximum number of concurrent downloads.
+    :param cache: Optional cache instance. If None, uses global cache if set.
+    :param timeout: Request timeout in seconds.
+    :return: A dictionary mapping each timestamp to its heatmap data as bytes.
+    :raises DownloadError: If any of the downloads fails.
+    """
+    # Import here to avoid circular imports
+    from .cache import get_cache
 
-            return content
-        else:
-            error_msg = f"Failed to download heatmap {url}: {response.status_code}"
-            logger.error(error_msg)
-            raise HTTPError(url, response.status_code, error_msg)
-    except requests.RequestException as e:
-        logger.error(f"Network error downloading heatmap from {url}: {e}")
-        raise DownloadError(f"Network error downloading heatmap from {url}: {e}") from e
+    # Use provided cache or fall back to global cache
+    effective_cache = cache if cache is not None else get_cache()
+
+    return _download_batch(
+        lambda session, timestamp: _download_one_heatmap(session, timestamp, effective_cache, timeout),
+        timestamps,
+        max_workers,
+    )
+
+
+def _decode_mapped_heatmap(
+    mapped: mmap.mmap,
+) -> Generator[
+    HeatmapDecoder.HeatEntry | HeatmapDecoder.CallsignEntry | HeatmapDecoder.TimestampSeparator,
+    None,
+    None,
+]:
+    """
+    Decode a memory-mapped heatmap file, closing the map once decoding is done.
+    :param mapped: The memory-mapped heatmap file.
+    :return: A generator of heatmap entries.
+    """
+    with mapped:
+        # The decoder only needs a sized buffer supporting read/seek/tell, which mmap provides
+        yield from HeatmapDecoder().decode_from_bytes(cast(bytes, mapped))
 
 
 def get_heatmap(
@@ -100,28 +214,38 @@ def get_heatmap(
     None,
     None,
 ]:
-    data: Final[bytes] = download_heatmap(timestamp)
+    """
+    Get the decoded heatmap for a given timestamp.
+
+    Heatmaps found in the global cache are decoded from its in-memory layer, or straight
+    from a memory map of the cached file, without copying it into memory first.
+
+    :param timestamp: The timestamp to get the heatmap for.
+    :return: A generator of heatmap entries.
+    """
+    # Import here to avoid circular imports
+    from .cache import get_cache
+
+    cache = get_cache()
+    data: bytes | mmap.mmap | None = cache.get_heatmap_buffer(timestamp) if cache is not None else None
+    if isinstance(data, mmap.mmap):
+        logger.debug(f"Using memory-mapped cached heatmap for {timestamp}")
+        return _decode_mapped_heatmap(data)
+    if data is None:
+        data = download_heatmap(timestamp)
     heatmap_decoder: Final[HeatmapDecoder] = HeatmapDecoder()
     return heatmap_decoder.decode_from_bytes(data)
 
 
-def haversine_distance(coord1: tuple[float, float], coord2: tuple[float, float]) -> float:
+def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
-    Calculate the Haversine distance between two geographical coordinates.
-    :param coord1: A tuple containing the latitude and longitude of the first point.
-    :param coord2: A tuple containing the latitude and longitude of the second point.
-    :return: The Haversine distance in meters.
+    Calculate the Haversine distance in meters between two points given in degrees.
     """
-    lat1, lon1 = coord1
-    lat2, lon2 = coord2
-
-    # Convert to radians using math module (faster for scalar values)
     lat1_rad = math.radians(lat1)
     lat2_rad = math.radians(lat2)
     delta_lat = math.radians(lat2 - lat1)
     delta_lon = math.radians(lon2 - lon1)
 
-    # Haversine formula
     a = math.sin(delta_lat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
@@ -129,15 +253,126 @@ def haversine_distance(coord1: tuple[float, float], coord2: tuple[float, float])
     return 6371000.0 * c
 
 
-def is_valid_location(valid_location: tuple[float, float], radius: float, location: tuple[float, float]) -> bool:
+@overload
+def haversine_distance(coord1: tuple[float, float], coord2: tuple[float, float]) -> float: ...
+
+
+@overload
+def haversine_distance(
+    coord1: tuple[float, float], coord2: npt.NDArray[np.floating[Any]]
+) -> npt.NDArray[np.float64]: ...
+
+
+def haversine_distance(
+    coord1: tuple[float, float], coord2: tuple[float, float] | npt.NDArray[np.floating[Any]]
+) -> float | npt.NDArray[np.float64]:
+    """
+    Calculate the Haversine distance between two geographical coordinates.
+    :param coord1: A tuple containing the latitude and longitude of the first point.
+    :param coord2: A tuple (or shape (2,) array) containing the latitude and longitude of the
+        second point, or an array of shape (N, 2) of latitude and longitude pairs.
+    :return: The Haversine distance in meters, or an array of N distances when coord2 is an (N, 2) array.
+    """
+    if isinstance(coord2, np.ndarray) and coord2.ndim == 2:
+        return haversine_distance_batch(coord2[:, 0], coord2[:, 1], coord1)
+    lat1, lon1 = coord1
+    lat2, lon2 = coord2
+    return _haversine(lat1, lon1, lat2, lon2)
+
+
+def haversine_distance_batch(
+    lats: npt.ArrayLike,
+    lons: npt.ArrayLike,
+    center: tuple[float, float],
+) -> npt.NDArray[np.float64]:
+    """
+    Calculate the Haversine distances between many coordinates and a single center point.
+    :param lats: The latitudes of the points, in degrees.
+    :param lons: The longitudes of the points, in degrees.
+    :param center: A tuple containing the latitude and longitude of the center point.
+    :return: An array with the Haversine distance of each point in meters.
+    """
+    center_lat, center_lon = center
+    lat_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    delta_lat = lat_rad - math.radians(center_lat)
+    delta_lon = np.radians(np.asarray(lons, dtype=np.float64) - center_lon)
+
+    a = np.sin(delta_lat / 2) ** 2 + math.cos(math.radians(center_lat)) * np.cos(lat_rad) * np.sin(delta_lon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    # Earth radius in meters
+    distances: npt.NDArray[np.float64] = 6371000.0 * c
+    return distances
+
+
+def _bounding_box_deltas(latitude: float, radius: float) -> tuple[float, float]:
+    """
+    Get the half-extents of the smallest latitude/longitude box around a circle.
+
+    Every point within radius of a center at the given latitude is at most this many
+    degrees of latitude and (wrapped) longitude away from it, on the haversine sphere.
+    :param latitude: The latitude of the center of the circle.
+    :param radius: The radius of the circle in meters.
+    :return: The maximum latitude and longitude deltas in degrees. The longitude delta
+        is 180 when the circle reaches a pole.
+    """
+    angular_radius = radius / 6371000.0
+    lat_delta = math.degrees(angular_radius)
+    sin_radius = math.sin(angular_radius)
+    cos_lat = math.cos(math.radians(latitude))
+    if angular_radius >= math.pi / 2 or sin_radius >= cos_lat:
+        return lat_delta, 180.0
+    return lat_delta, math.degrees(math.asin(sin_radius / cos_lat))
+
+
+def _wrapped_lon_delta(lon: npt.NDArray[np.float64], center_lon: float) -> npt.NDArray[np.float64]:
+    """Get the longitude differences to a center, wrapped to [-180, 180) across the antimeridian."""
+    delta: npt.NDArray[np.float64] = (lon - center_lon + 180.0) % 360.0 - 180.0
+    return delta
+
+
+@overload
+def is_valid_location(valid_location: tuple[float, float], radius: float, location: tuple[float, float]) -> bool: ...
+
+
+@overload
+def is_valid_location(
+    valid_location: tuple[float, float], radius: float, location: npt.NDArray[np.floating[Any]]
+) -> npt.NDArray[np.bool_]: ...
+
+
+def is_valid_location(
+    valid_location: tuple[float, float],
+    radius: float,
+    location: tuple[float, float] | npt.NDArray[np.floating[Any]],
+) -> bool | npt.NDArray[np.bool_]:
     """
     Check if a given location is within a valid radius of a valid location.
     :param valid_location: A tuple containing the valid latitude and longitude.
     :param radius: The radius in meters within which the location is considered valid.
-    :param location: A tuple containing the latitude and longitude to check.
-    :return: True if the location is within the valid radius, False otherwise.
+    :param location: A tuple (or shape (2,) array) containing the latitude and longitude to check,
+        or an array of shape (N, 2) of latitude and longitude pairs.
+    :return: True if the location is within the valid radius, False otherwise,
+        or a boolean mask of the N locations when location is an (N, 2) array.
     """
-    return haversine_distance(valid_location, location) <= radius
+    lat1, lon1 = valid_location
+    if isinstance(location, np.ndarray) and location.ndim == 2:
+        lat = np.asarray(location[:, 0], dtype=np.float64)
+        lon = np.asarray(location[:, 1], dtype=np.float64)
+        # Bounding box rejection first, so only the points near the center pay for the haversine
+        lat_delta, lon_delta = _bounding_box_deltas(lat1, radius)
+        candidates = np.flatnonzero(
+            (np.abs(lat - lat1) <= lat_delta) & (np.abs(_wrapped_lon_delta(lon, lon1)) <= lon_delta)
+        )
+        mask = np.zeros(len(location), dtype=np.bool_)
+        mask[candidates] = haversine_distance_batch(lat[candidates], lon[candidates], valid_location) <= radius
+        return mask
+    lat2, lon2 = location
+    # No point is closer than its latitude difference along the meridian: reject those without any trig
+    if abs(lat2 - lat1) * _METERS_PER_DEGREE > radius:
+        return False
+    # Call the scalar kernel directly, sparing a Python call level in per-entry filtering loops
+    return _haversine(lat1, lon1, lat2, lon2) <= radius
 
 
 class FullHeatmapEntry(HeatmapDecoder.HeatEntry):
@@ -145,6 +380,9 @@ class FullHeatmapEntry(HeatmapDecoder.HeatEntry):
     A full heatmap entry that includes the timestamp and callsign.
     """
 
+    # HeatEntry is a slotted dataclass, so declaring slots here keeps instances free of a __dict__
+    __slots__ = ("timestamp", "callsign")
+
     timestamp: datetime | None
     callsign: str | None
 
@@ -166,6 +404,129 @@ class FullHeatmapEntry(HeatmapDecoder.HeatEntry):
         return f"FullHeatmapEntry(timestamp={self.timestamp}, callsign={self.callsign}, lat={self.lat}, lon={self.lon})"
 
 
+@dataclass(slots=True, frozen=True, eq=False)
+class FullHeatmapBatch:
+    """
+    The entries of a heatmap stored column-wise, one NumPy array per field.
+
+    Much more compact than a list of FullHeatmapEntry objects, and filters over whole
+    columns (e.g. is_valid_location on the coordinates) run vectorized.
+    Timestamps are UTC, unknown callsigns are empty strings and unknown ground speeds are NaN.
+    Altitudes are numeric feet, NaN when unknown; aircraft on the ground are flagged in
+    is_ground, with an altitude of 0, so altitude filters stay plain array comparisons.
+    Coordinates are kept as int32 millionths of a degree, the resolution of the heatmap
+    format, which halves their footprint without losing precision; lat and lon give them in degrees.
+    The cosines of the latitudes are computed once at parse time, as every distance filter needs them.
+    Batches compare and hash by identity, as comparing their columns has no single truth value.
+
+    Example:
+        batch = get_heatmap_batch(timestamp)
+        nearby = batch.take(batch.within(48.8566, 2.3522, 10_000))
+    """
+
+    timestamps: npt.NDArray[np.datetime64]
+    callsigns: npt.NDArray[np.str_]
+    hex_ids: npt.NDArray[np.str_]
+    lat_e6: npt.NDArray[np.int32]
+    lon_e6: npt.NDArray[np.int32]
+    coslat: npt.NDArray[np.float64]
+    alt: npt.NDArray[np.float32]
+    is_ground: npt.NDArray[np.bool_]
+    ground_speed: npt.NDArray[np.float32]
+
+    def __len__(self) -> int:
+        return len(self.hex_ids)
+
+    @property
+    def lat(self) -> npt.NDArray[np.float64]:
+        """The latitudes of the entries, in degrees."""
+        lat: npt.NDArray[np.float64] = self.lat_e6 / 1e6
+        return lat
+
+    @property
+    def lon(self) -> npt.NDArray[np.float64]:
+        """The longitudes of the entries, in degrees."""
+        lon: npt.NDArray[np.float64] = self.lon_e6 / 1e6
+        return lon
+
+    def __getitem__(self, index: int) -> FullHeatmapEntry:
+        alt: int | str | None
+        if self.is_ground[index]:
+            alt = "ground"
+        else:
+            alt_value = float(self.alt[index])
+            alt = None if math.isnan(alt_value) else int(alt_value)
+        ground_speed = float(self.ground_speed[index])
+        return FullHeatmapEntry(
+            self.timestamps[index].astype(datetime).replace(tzinfo=UTC),
+            str(self.callsigns[index]) or None,
+            str(self.hex_ids[index]),
+            int(self.lat_e6[index]) / 1e6,
+            int(self.lon_e6[index]) / 1e6,
+            alt,
+            None if math.isnan(ground_speed) else ground_speed,
+        )
+
+    def __iter__(self) -> Iterator[FullHeatmapEntry]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def within(self, latitude: float, longitude: float, radius: float) -> npt.NDArray[np.bool_]:
+        """
+        Get the mask of the entries within radius of a center.
+
+        Small radii are checked with an equirectangular approximation computed from the
+        exact integer coordinate deltas; larger ones with the haversine formula. Both use
+        the precomputed coslat column, so no cosine is evaluated per entry.
+        :param latitude: The latitude of the center.
+        :param longitude: The longitude of the center.
+        :param radius: The radius in meters.
+        :return: A boolean mask over the entries.
+        """
+        dlat_e6 = self.lat_e6 - round(latitude * 1e6)
+        # Wrapped to [-180, 180) degrees, so points across the antimeridian are as close as they look
+        dlon_e6 = (self.lon_e6 - round(longitude * 1e6) + 180_000_000) % 360_000_000 - 180_000_000
+        cos_lat_product = math.cos(math.radians(latitude)) * self.coslat
+        mask: npt.NDArray[np.bool_]
+        if radius >= _FLAT_EARTH_MAX_RADIUS:
+            half_angle = radius / (2 * 6371000.0)
+            max_a = math.sin(half_angle) ** 2 if half_angle < math.pi / 2 else 1.0
+            sin_half_dlat = np.sin(np.radians(dlat_e6 * 0.5e-6))
+            sin_half_dlon = np.sin(np.radians(dlon_e6 * 0.5e-6))
+            mask = sin_half_dlat * sin_half_dlat + cos_lat_product * sin_half_dlon * sin_half_dlon <= max_a
+            return mask
+        dy = dlat_e6.astype(np.float64)
+        dx = dlon_e6.astype(np.float64)
+        max_dist_e6 = radius / _METERS_PER_DEGREE * 1e6
+        mask = dy * dy + cos_lat_product * dx * dx <= max_dist_e6 * max_dist_e6
+        return mask
+
+    def take(self, selector: npt.NDArray[np.bool_] | npt.NDArray[np.intp]) -> "FullHeatmapBatch":
+        """
+        Get a batch holding a subset of the entries.
+
+        :param selector: A boolean mask over the entries, or an array of entry indices.
+        :return: The batch of the selected entries.
+        """
+        return FullHeatmapBatch(
+            self.timestamps[selector],
+            self.callsigns[selector],
+            self.hex_ids[selector],
+            self.lat_e6[selector],
+            self.lon_e6[selector],
+            self.coslat[selector],
+            self.alt[selector],
+            self.is_ground[selector],
+            self.ground_speed[selector],
+        )
+
+
+# Module-level aliases of the decoder entry types, used for exact type dispatch
+_HeatEntry = HeatmapDecoder.HeatEntry
+_CallsignEntry = HeatmapDecoder.CallsignEntry
+_TimestampSeparator = HeatmapDecoder.TimestampSeparator
+
+
 def get_heatmap_entries(timestamp: datetime) -> Generator[FullHeatmapEntry, None, None]:
     """
     Get heatmap entries for a given timestamp.
@@ -177,21 +538,213 @@ def get_heatmap_entries(timestamp: datetime) -> Generator[FullHeatmapEntry, None
     current_timestamp: datetime = timestamp
     # rounds minutes by half hour
     current_timestamp = current_timestamp.replace(minute=(current_timestamp.minute // 30) * 30, second=0, microsecond=0)
+    # Dispatch on the exact entry type, testing the dominant HeatEntry case first
     for entry in heatmap_entries:
-        if isinstance(entry, HeatmapDecoder.CallsignEntry):
-            icao_callsigns_map[entry.hex_id] = entry.callsign
-        elif isinstance(entry, HeatmapDecoder.TimestampSeparator):
-            current_timestamp = entry.timestamp.replace(tzinfo=UTC)
-        elif isinstance(entry, HeatmapDecoder.HeatEntry):
+        if type(entry) is _HeatEntry:
             yield FullHeatmapEntry(
-                timestamp=current_timestamp,
-                callsign=icao_callsigns_map.get(entry.hex_id),
-                hex_id=entry.hex_id,
-                lat=entry.lat,
-                lon=entry.lon,
-                alt=entry.alt,
-                ground_speed=entry.ground_speed,
+                current_timestamp,
+                icao_callsigns_map.get(entry.hex_id),
+                entry.hex_id,
+                entry.lat,
+                entry.lon,
+                entry.alt,
+                entry.ground_speed,
             )
+        elif type(entry) is _CallsignEntry:
+            icao_callsigns_map[entry.hex_id] = entry.callsign
+        elif type(entry) is _TimestampSeparator:
+            current_timestamp = entry.timestamp.replace(tzinfo=UTC)
+
+
+# On-disk layout of a heatmap record, as written by readsb
+_HEATMAP_RECORD_DTYPE: Final[np.dtype[Any]] = np.dtype(
+    [("hex", "<u4"), ("lat", "<i4"), ("lon", "<i4"), ("alt", "<i2"), ("gs", "<u2")]
+)
+_HEATMAP_MAGIC: Final[int] = HeatmapDecoder.MAGIC_NUMBER
+# Callsign records have a latitude at or above this flag, out of the range of real microdegrees
+_HEATMAP_INFO_FLAG: Final[int] = 1 << 30
+_HEATMAP_ALT_GROUND: Final[int] = -123
+_HEATMAP_ALT_UNKNOWN: Final[int] = -124
+_HEATMAP_GS_UNKNOWN: Final[int] = 0xFFFF
+
+
+def _heatmap_records(data: bytes | mmap.mmap) -> npt.NDArray[np.void]:
+    """
+    View raw heatmap data as an array of records, in the byte order of the file.
+
+    The byte order is taken from the first separator whose magic number matches either
+    way round, defaulting to little-endian like the reference decoder.
+    :param data: The raw heatmap data.
+    :return: A read-only record array sharing the memory of the data.
+    """
+    records = np.frombuffer(data, dtype=_HEATMAP_RECORD_DTYPE, count=len(data) // _HEATMAP_RECORD_DTYPE.itemsize)
+    hex_words = records["hex"]
+    is_magic_le = hex_words == _HEATMAP_MAGIC
+    is_magic_be = hex_words.byteswap() == _HEATMAP_MAGIC
+    magic_positions = np.flatnonzero(is_magic_le | is_magic_be)
+    if magic_positions.size and not is_magic_le[magic_positions[0]]:
+        return records.view(_HEATMAP_RECORD_DTYPE.newbyteorder(">"))
+    return records
+
+
+def _parse_heatmap_batch(data: bytes | mmap.mmap, timestamp: datetime) -> FullHeatmapBatch:
+    """
+    Parse raw heatmap data into a batch with whole-array operations.
+
+    Callsigns are forward-filled per aircraft and timestamps per separator, as the
+    entry-by-entry decoder does. Callsign records hold the 8 callsign bytes in the
+    lon, alt and gs fields.
+    :param data: The raw heatmap data, which is not referenced by the returned batch.
+    :param timestamp: The timestamp of the heatmap, used until the first separator.
+    :return: A batch holding all the heat entries of the data.
+    """
+    records = _heatmap_records(data)
+    hex_words = records["hex"]
+    lat = records["lat"]
+    is_separator = hex_words == _HEATMAP_MAGIC
+    is_info = ~is_separator & (lat >= _HEATMAP_INFO_FLAG)
+    is_heat = ~(is_separator | is_info)
+    positions = np.arange(len(records))
+
+    # Separators store the epoch milliseconds split in two unsigned 32-bit halves
+    separator_ms = ((lat.astype(np.int64) & 0xFFFFFFFF) << 32) | (records["lon"].astype(np.int64) & 0xFFFFFFFF)
+    start = timestamp.replace(minute=(timestamp.minute // 30) * 30, second=0, microsecond=0)
+    if start.tzinfo is not None:
+        start = start.astimezone(UTC).replace(tzinfo=None)
+    last_separator = np.maximum.accumulate(np.where(is_separator, positions, -1))[is_heat]
+    timestamps = np.where(
+        last_separator >= 0,
+        separator_ms[last_separator],
+        np.datetime64(start, "ms").astype(np.int64),
+    ).astype("datetime64[ms]")
+
+    # Forward-fill callsigns per aircraft: a stable sort groups the records by address in
+    # file order, so the latest callsign record of a group is a running maximum of positions
+    addresses = np.where(is_separator, 1 << 24, hex_words & 0xFFFFFF).astype(np.uint32)
+    order = np.argsort(addresses, kind="stable")
+    sorted_addresses = addresses[order]
+    latest_info = np.maximum.accumulate(np.where(is_info[order], positions, -1))
+    has_info = latest_info >= 0
+    has_info &= sorted_addresses[np.maximum(latest_info, 0)] == sorted_addresses
+    last_info = np.empty_like(positions)
+    last_info[order] = np.where(has_info, order[np.maximum(latest_info, 0)], -1)
+    last_info = last_info[is_heat]
+
+    info_callsigns = np.full(len(records), "", dtype="U8")
+    callsign_bytes = np.ascontiguousarray(records.view(np.uint8).reshape(-1, 16)[is_info, 8:]).view("S8").ravel()
+    info_callsigns[is_info] = np.char.decode(callsign_bytes, "ascii", errors="ignore")
+    callsigns = np.where(last_info >= 0, info_callsigns[np.maximum(last_info, 0)], "")
+
+    # Hexadecimal addresses are formatted in one go from their 3 big-endian bytes
+    heat_addresses = addresses[is_heat].astype(">u4").view(np.uint8).reshape(-1, 4)[:, 1:]
+    hex_ids = np.frombuffer(heat_addresses.tobytes().hex().encode("ascii"), dtype="S6").astype("U6")
+
+    lat_e6 = lat[is_heat].astype(np.int32)
+    raw_alt = records["alt"][is_heat]
+    is_ground = raw_alt == _HEATMAP_ALT_GROUND
+    alt = (raw_alt.astype(np.float64) * 25).astype(np.float32)
+    alt[is_ground] = 0.0
+    alt[raw_alt == _HEATMAP_ALT_UNKNOWN] = np.nan
+    raw_gs = records["gs"][is_heat]
+    ground_speed = (raw_gs / 10.0).astype(np.float32)
+    ground_speed[raw_gs == _HEATMAP_GS_UNKNOWN] = np.nan
+
+    return FullHeatmapBatch(
+        timestamps=timestamps,
+        callsigns=callsigns.astype("U8"),
+        hex_ids=hex_ids,
+        lat_e6=lat_e6,
+        lon_e6=records["lon"][is_heat].astype(np.int32),
+        coslat=np.cos(np.radians(lat_e6 / 1e6)),
+        alt=alt,
+        is_ground=is_ground,
+        ground_speed=ground_speed,
+    )
+
+
+def get_heatmap_batch(timestamp: datetime) -> FullHeatmapBatch:
+    """
+    Get the heatmap entries for a given timestamp as column arrays.
+
+    The raw heatmap is parsed directly into the columns, from the in-memory layer of the
+    global cache or a memory map of the cached file when the cache holds it.
+    :param timestamp: The timestamp to get the heatmap entries for.
+    :return: A batch holding all the heatmap entries.
+    """
+    # Import here to avoid circular imports
+    from .cache import get_cache
+
+    cache = get_cache()
+    data = cache.get_heatmap_buffer(timestamp) if cache is not None else None
+    if isinstance(data, mmap.mmap):
+        try:
+            return _parse_heatmap_batch(data, timestamp)
+        finally:
+            # After a failed parse, the traceback keeps array views on the map alive: closing it would
+            # then raise BufferError over the actual error, so the map is left to the garbage collector
+            with contextlib.suppress(BufferError):
+                data.close()
+
+    return _parse_heatmap_batch(data if data is not None else download_heatmap(timestamp), timestamp)
+
+
+_ZoneFilter = Callable[[list[FullHeatmapEntry], list[float], list[float]], list[FullHeatmapEntry]]
+
+
+def _make_zone_filter(latitude: float, longitude: float, radius: float) -> _ZoneFilter:
+    """
+    Build a chunk filter keeping the heatmap entries within radius of a center.
+
+    Everything depending only on the zone (bounding box, center trigonometry, distance
+    threshold) is computed once here, so each chunk only pays for the per-entry array work.
+    :param latitude: The latitude of the center of the zone.
+    :param longitude: The longitude of the center of the zone.
+    :param radius: The radius of the zone in meters.
+    :return: A function taking the entries of a chunk with their latitudes and longitudes,
+        and returning the entries within the zone, in their original order.
+    """
+    # Pre-compute the bounding box of the zone for fast rejection
+    lat_delta, lon_delta = _bounding_box_deltas(latitude, radius)
+    min_lat, max_lat = latitude - lat_delta, latitude + lat_delta
+
+    if radius < _FLAT_EARTH_MAX_RADIUS:
+        # Equirectangular check on squared distances, compared in degrees: no sqrt, and a single cos per entry
+        max_dist_deg_sq = (radius / _METERS_PER_DEGREE) ** 2
+
+        def select(lat: npt.NDArray[np.float64], dlon: npt.NDArray[np.float64]) -> npt.NDArray[np.bool_]:
+            dx = dlon * np.cos(np.radians((lat + latitude) * 0.5))
+            dy = lat - latitude
+            inside: npt.NDArray[np.bool_] = dx * dx + dy * dy <= max_dist_deg_sq
+            return inside
+
+    else:
+        # Precise haversine check. The distance grows with the haversine term a, so a is compared
+        # against the value it takes at the radius instead of converting every entry to meters.
+        center_lat_rad = math.radians(latitude)
+        cos_center_lat = math.cos(center_lat_rad)
+        half_angle = radius / (2 * 6371000.0)
+        max_a = math.sin(half_angle) ** 2 if half_angle < math.pi / 2 else 1.0
+
+        def select(lat: npt.NDArray[np.float64], dlon: npt.NDArray[np.float64]) -> npt.NDArray[np.bool_]:
+            lat_rad = np.radians(lat)
+            sin_half_dlat = np.sin((lat_rad - center_lat_rad) * 0.5)
+            sin_half_dlon = np.sin(np.radians(dlon) * 0.5)
+            a = sin_half_dlat * sin_half_dlat + cos_center_lat * np.cos(lat_rad) * sin_half_dlon * sin_half_dlon
+            inside: npt.NDArray[np.bool_] = a <= max_a
+            return inside
+
+    def zone_filter(entries: list[FullHeatmapEntry], lats: list[float], lons: list[float]) -> list[FullHeatmapEntry]:
+        lat = np.asarray(lats, dtype=np.float64)
+        dlon = _wrapped_lon_delta(np.asarray(lons, dtype=np.float64), longitude)
+
+        # Fast bounding box rejection
+        candidates = np.flatnonzero((lat >= min_lat) & (lat <= max_lat) & (np.abs(dlon) <= lon_delta))
+        if candidates.size == 0:
+            return []
+        inside = select(lat[candidates], dlon[candidates])
+        return [entries[i] for i in candidates[inside]]
+
+    return zone_filter
 
 
 def get_zoned_heatmap_entries(
@@ -205,37 +758,22 @@ def get_zoned_heatmap_entries(
     :param radius: The radius of the zone in meters.
     :return: A zoned heatmap object.
     """
-    # Pre-compute bounding box for fast rejection (approximate)
-    # 1 degree of latitude ≈ 111,320 meters
-    # 1 degree of longitude ≈ 111,320 * cos(latitude) meters
-    lat_delta = radius / 111320.0
-    lon_delta = radius / (111320.0 * math.cos(math.radians(latitude)))
-
-    min_lat = latitude - lat_delta
-    max_lat = latitude + lat_delta
-    min_lon = longitude - lon_delta
-    max_lon = longitude + lon_delta
-
-    # Pre-compute center point values for haversine
-    center_lat_rad = math.radians(latitude)
-    cos_center_lat = math.cos(center_lat_rad)
-
-    heatmap_entries = get_heatmap_entries(timestamp)
-    for entry in heatmap_entries:
-        # Fast bounding box rejection
-        if not (min_lat <= entry.lat <= max_lat and min_lon <= entry.lon <= max_lon):
-            continue
-
-        # Precise haversine check (inlined and optimized)
-        lat_rad = math.radians(entry.lat)
-        delta_lat = lat_rad - center_lat_rad
-        delta_lon = math.radians(entry.lon - longitude)
+    zone_filter = _make_zone_filter(latitude, longitude, radius)
 
-        a = math.sin(delta_lat / 2) ** 2 + cos_center_lat * math.cos(lat_rad) * math.sin(delta_lon / 2) ** 2
-        distance = 6371000.0 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    # Entries are buffered so the distance filter runs on whole chunks with NumPy
+    entries: list[FullHeatmapEntry] = []
+    lats: list[float] = []
+    lons: list[float] = []
+    for entry in get_heatmap_entries(timestamp):
+        entries.append(entry)
+        lats.append(entry.lat)
+        lons.append(entry.lon)
+        if len(entries) == _ZONE_FILTER_CHUNK_SIZE:
+            yield from zone_filter(entries, lats, lons)
+            entries, lats, lons = [], [], []
 
-        if distance <= radius:
-            yield entry
+    if entries:
+        yield from zone_filter(entries, lats, lons)
 
 
 # Module-level headers constant to avoid recreating dict on every call
@@ -262,6 +800,141 @@ _TRACE_HEADERS: Final[dict[str, str]] = {
     "Pragma": "no-cache",
 }
 
+# Case-normalized once at import; sessions get a cheap copy instead of re-inserting every header
+_TRACE_HEADERS_CID: Final[CaseInsensitiveDict[str | bytes]] = CaseInsensitiveDict(_TRACE_HEADERS)
+
+# Connection pool size of the long-lived HTTP sessions (shared session and TraceSession)
+_HTTP_POOL_SIZE: Final[int] = 32
+# Number of per-host pools kept by the adapters. All downloads target a single host,
+# so this only needs to cover the odd redirect.
+_HTTP_POOL_CONNECTIONS: Final[int] = 16
+
+_shared_session: requests.Session | None = None
+_shared_session_lock = threading.Lock()
+
+
+def _get_shared_session() -> requests.Session:
+    """
+    Get the HTTP session shared by the module-level download functions.
+
+    The session is created on first use and reused afterwards, so consecutive downloads
+    keep their TCP and TLS connections alive instead of reconnecting on every call.
+
+    :return: The shared session.
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                session = requests.Session()
+                session.headers = _TRACE_HEADERS_CID.copy()
+                retries = Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=_HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=_HTTP_POOL_SIZE,
+                    max_retries=retries,
+                )
+                session.mount("https://", adapter)
+                _shared_session = session
+    return _shared_session
+
+
+def _download_batch[K](
+    download_one: Callable[[requests.Session, K], bytes],
+    keys: Iterable[K],
+    max_workers: int,
+    skip_not_found: bool = False,
+) -> dict[K, bytes]:
+    """
+    Run downloads concurrently over a thread pool sharing one HTTP session.
+
+    The connection pool of the session holds one connection per worker. On the first
+    failure, the downloads not started yet are cancelled instead of being run for nothing.
+
+    :param download_one: The function downloading the data of one key with the given session.
+    :param keys: The keys to download the data of.
+    :param max_workers: The maximum number of concurrent downloads.
+    :param skip_not_found: Leave out the keys whose download fails with HTTP 404 instead of raising.
+    :return: A dictionary mapping each key to its data as bytes.
+    :raises DownloadError: If any of the downloads fails.
+    """
+    with requests.Session() as session:
+        session.headers = _TRACE_HEADERS_CID.copy()
+        session.mount("https://", HTTPAdapter(pool_connections=_HTTP_POOL_CONNECTIONS, pool_maxsize=max_workers))
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {executor.submit(download_one, session, key): key for key in keys}
+            results: dict[K, bytes] = {}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except HTTPError as e:
+                    if not (skip_not_found and e.status_code == 404):
+                        raise
+                    logger.debug(f"Skipping {futures[future]}: not found at {e.url}")
+            return results
+        finally:
+            # Downloads already running finish before the session is closed
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _download_one_trace(
+    session: requests.Session,
+    icao: str,
+    timestamp: datetime,
+    cache: "Cache | None",
+    timeout: float,
+) -> bytes:
+    """
+    Download the trace for a given ICAO and timestamp with the given session.
+
+    :param session: The HTTP session to download with.
+    :param icao: The ICAO code of the aircraft.
+    :param timestamp: The timestamp to download the trace for.
+    :param cache: The cache to read from and store into, or None to disable caching.
+    :param timeout: Request timeout in seconds.
+    :return: The trace data as bytes.
+    """
+    # Check cache first
+    if cache is not None:
+        cached_data = cache.get_trace(icao, timestamp)
+        if cached_data is not None:
+            logger.debug(f"Using cached trace for {icao} at {timestamp.date()}")
+            return cached_data
+
+    date_str: Final[str] = date_path(timestamp.year, timestamp.month, timestamp.day)
+    icao_lower: Final[str] = icao.lower()
+    sub_folder: Final[str] = icao_lower[-2:]
+    filename: Final[str] = f"trace_full_{icao_lower}.json"
+    url: Final[str] = f"{ADSBEXCHANGE_HISTORICAL_DATA_URL}{date_str}/traces/{sub_folder}/{filename}"
+
+    logger.info(f"Downloading trace for ICAO {icao} from {url}")
+
+    try:
+        response: Final[requests.Response] = session.get(url, timeout=timeout)
+
+        if response.status_code == 200:
+            logger.debug(f"Successfully downloaded trace for {icao}, size: {len(response.content)} bytes")
+
+            # Store in cache
+            if cache is not None:
+                cache.put_trace(icao, timestamp, response.content)
+
+            return response.content
+        else:
+            error_msg = f"Failed to download trace {url}: {response.status_code}"
+            logger.error(error_msg)
+            raise HTTPError(url, response.status_code, error_msg)
+    except requests.RequestException as e:
+        logger.error(f"Network error downloading trace for {icao} from {url}: {e}")
+        raise DownloadError(f"Network error downloading trace for {icao} from {url}: {e}") from e
+
 
 def download_traces(
     icao: str,
@@ -282,44 +955,50 @@ def download_traces(
     # Use provided cache or fall back to global cache
     effective_cache = cache if cache is not None else get_cache()
 
-    # Check cache first
-    if effective_cache is not None:
-        cached_data = effective_cache.get_trace(icao, timestamp)
-        if cached_data is not None:
-            logger.debug(f"Using cached trace for {icao} at {timestamp.date()}")
-            return cached_data
+    # Reuse the shared session to keep connections alive across calls
+    return _download_one_trace(_get_shared_session(), icao, timestamp, effective_cache, 30.0)
 
-    date_str: Final[str] = timestamp.strftime("%Y/%m/%d")
-    sub_folder: Final[str] = icao.lower()[-2:]
-    filename: Final[str] = f"trace_full_{icao.lower()}.json"
-    url: Final[str] = f"{ADSBEXCHANGE_HISTORICAL_DATA_URL}{date_str}/traces/{sub_folder}/{filename}"
 
-    logger.info(f"Downloading trace for ICAO {icao} from {url}")
+def download_traces_batch(
+    icaos: Iterable[str],
+    timestamp: datetime,
+    max_workers: int = 16,
+    cache: "Cache | None" = None,
+    timeout: float = 30.0,
+) -> dict[str, bytes]:
+    """
+    Download the traces of many aircraft for a given timestamp concurrently.
 
-    try:
-        # Use a session to maintain cookies and connection state
-        with requests.Session() as session:
-            # Set session headers (use module-level constant)
-            session.headers.update(_TRACE_HEADERS)
+    The downloads are spread over a thread pool sharing one HTTP session whose
+    connection pool holds one connection per worker. Aircraft without a trace on that
+    day (HTTP 404) are left out of the result; any other failure cancels the downloads
+    not started yet and is raised.
 
-            # Make the request
-            response: Final[requests.Response] = session.get(url, timeout=30)
+    Example:
+        traces = download_traces_batch(["ac134a", "4ca7b5"], timestamp)
+        for icao, data in traces.items():
+            process(icao, data)
 
-            if response.status_code == 200:
-                logger.debug(f"Successfully downloaded trace for {icao}, size: {len(response.content)} bytes")
+    :param icaos: The ICAO codes of the aircraft.
+    :param timestamp: The timestamp to download the traces for.
+    :param max_workers: The maximum number of concurrent downloads.
+    :param cache: Optional cache instance. If None, uses global cache if set.
+    :param timeout: Request timeout in seconds.
+    :return: A dictionary mapping each ICAO code with a trace to its trace data as bytes.
+    :raises DownloadError: If any of the downloads fails for another reason than a missing trace.
+    """
+    # Import here to avoid circular imports
+    from .cache import get_cache
 
-                # Store in cache
-                if effective_cache is not None:
-                    effective_cache.put_trace(icao, timestamp, response.content)
+    # Use provided cache or fall back to global cache
+    effective_cache = cache if cache is not None else get_cache()
 
-                return response.content
-            else:
-                error_msg = f"Failed to download trace {url}: {response.status_code}"
-                logger.error(error_msg)
-                raise HTTPError(url, response.status_code, error_msg)
-    except requests.RequestException as e:
-        logger.error(f"Network error downloading trace for {icao} from {url}: {e}")
-        raise DownloadError(f"Network error downloading trace for {icao} from {url}: {e}") from e
+    return _download_batch(
+        lambda session, icao: _download_one_trace(session, icao, timestamp, effective_cache, timeout),
+        icaos,
+        max_workers,
+        skip_not_found=True,
+    )
 
 
 def get_traces(icao: str, timestamp: datetime) -> Generator[TraceEntry, None, None]:
@@ -334,6 +1013,32 @@ def get_traces(icao: str, timestamp: datetime) -> Generator[TraceEntry, None, No
     return process_traces_from_json_bytes(data)
 
 
+def get_traces_filtered(
+    icao: str, timestamp: datetime, center: tuple[float, float], radius: float
+) -> Generator[TraceEntry, None, None]:
+    """
+    Get the trace entries for a given ICAO and timestamp that are within radius of a center.
+
+    The location check runs on each entry as it is decoded, so entries outside the zone are
+    dropped on the spot rather than collected first. Most of them are rejected by the
+    bounding box of the zone, without computing any distance.
+    :param icao: The ICAO code of the aircraft.
+    :param timestamp: The timestamp to get the trace for.
+    :param center: A tuple containing the latitude and longitude of the center of the zone.
+    :param radius: The radius of the zone in meters.
+    :return: A generator yielding the trace entries within the zone.
+    """
+    center_lat, center_lon = center
+    lat_delta, lon_delta = _bounding_box_deltas(center_lat, radius)
+    for entry in get_traces(icao, timestamp):
+        lat = entry.latitude
+        lon = entry.longitude
+        if abs(lat - center_lat) > lat_delta or abs((lon - center_lon + 180.0) % 360.0 - 180.0) > lon_delta:
+            continue
+        if _haversine(center_lat, center_lon, lat, lon) <= radius:
+            yield entry
+
+
 class TraceSession:
     """
     A session-based trace downloader for efficient bulk trace downloads.
@@ -341,6 +1046,9 @@ class TraceSession:
     Reuses HTTP connections across multiple requests, significantly improving
     performance when downloading traces for multiple aircraft.
 
+    The session can be used from several threads at once: each thread lazily gets
+    its own requests.Session, and all of them share one connection pool.
+
     Example:
         with TraceSession() as session:
             for icao in icao_list:
@@ -352,6 +1060,10 @@ class TraceSession:
         cache = Cache("/path/to/cache")
         with TraceSession(cache=cache) as session:
             traces = session.get_traces(icao, timestamp)
+
+        # From a thread pool:
+        with TraceSession() as session, ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda icao: session.download_traces(icao, timestamp), icao_list))
     """
 
     def __init__(
@@ -365,13 +1077,16 @@ class TraceSession:
         :param timeout: Request timeout in seconds.
         :param cache: Optional cache instance. If None, uses global cache if set.
         """
-        self._session: requests.Session | None = None
+        self._local: threading.local | None = None
+        self._adapter: HTTPAdapter | None = None
+        self._sessions: list[requests.Session] = []
+        self._sessions_lock = threading.Lock()
         self._timeout = timeout
         self._cache = cache
 
     def __enter__(self) -> "TraceSession":
-        self._session = requests.Session()
-        self._session.headers.update(_TRACE_HEADERS)
+        self._local = threading.local()
+        self._adapter = HTTPAdapter(pool_connections=_HTTP_POOL_CONNECTIONS, pool_maxsize=_HTTP_POOL_SIZE)
         return self
 
     def __exit__(
@@ -380,9 +1095,35 @@ class TraceSession:
         exc_val: BaseException | None,
         exc_tb: object,
     ) -> None:
-        if self._session:
-            self._session.close()
-            self._session = None
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+        if self._adapter is not None:
+            self._adapter.close()
+        self._adapter = None
+        self._local = None
+
+    def _get_session(self) -> requests.Session:
+        """
+        Get the HTTP session of the calling thread, creating it on first use.
+
+        :return: The session of the calling thread.
+        """
+        if self._local is None or self._adapter is None:
+            msg = "TraceSession must be used as a context manager"
+            raise RuntimeError(msg)
+
+        session: requests.Session | None = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers = _TRACE_HEADERS_CID.copy()
+            # All thread sessions share the same adapter, hence the same connection pool
+            session.mount("https://", self._adapter)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
 
     def download_traces(self, icao: str, timestamp: datetime) -> bytes:
         """
@@ -392,9 +1133,7 @@ class TraceSession:
         :param timestamp: The timestamp to download the trace for.
         :return: The trace data as bytes.
         """
-        if self._session is None:
-            msg = "TraceSession must be used as a context manager"
-            raise RuntimeError(msg)
+        session = self._get_session()
 
         # Import here to avoid circular imports
         from .cache import get_cache
@@ -402,38 +1141,7 @@ class TraceSession:
         # Use provided cache or fall back to global cache
         effective_cache = self._cache if self._cache is not None else get_cache()
 
-        # Check cache first
-        if effective_cache is not None:
-            cached_data = effective_cache.get_trace(icao, timestamp)
-            if cached_data is not None:
-                logger.debug(f"Using cached trace for {icao} at {timestamp.date()}")
-                return cached_data
-
-        date_str: Final[str] = timestamp.strftime("%Y/%m/%d")
-        sub_folder: Final[str] = icao.lower()[-2:]
-        filename: Final[str] = f"trace_full_{icao.lower()}.json"
-        url: Final[str] = f"{ADSBEXCHANGE_HISTORICAL_DATA_URL}{date_str}/traces/{sub_folder}/{filename}"
-
-        logger.info(f"Downloading trace for ICAO {icao} from {url}")
-
-        try:
-            response: Final[requests.Response] = self._session.get(url, timeout=self._timeout)
-
-            if response.status_code == 200:
-                logger.debug(f"Successfully downloaded trace for {icao}, size: {len(response.content)} bytes")
-
-                # Store in cache
-                if effective_cache is not None:
-                    effective_cache.put_trace(icao, timestamp, response.content)
-
-                return response.content
-            else:
-                error_msg = f"Failed to download trace {url}: {response.status_code}"
-                logger.error(error_msg)
-                raise HTTPError(url, response.status_code, error_msg)
-        except requests.RequestException as e:
-            logger.error(f"Network error downloading trace for {icao} from {url}: {e}")
-            raise DownloadError(f"Network error downloading trace for {icao} from {url}: {e}") from e
+        return _download_one_trace(session, icao, timestamp, effective_cache, self._timeout)
 
     def get_traces(self, icao: str, timestamp: datetime) -> Generator[TraceEntry, None, None]:
         """
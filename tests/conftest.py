@@ -2,9 +2,15 @@
 Pytest configuration and shared fixtures.
 """
 
+import io
+from collections.abc import Generator
 from datetime import datetime
+from typing import Any
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+import requests
+from requests.adapters import BaseAdapter
 
 
 @pytest.fixture
@@ -27,6 +33,7 @@ def mock_successful_response():
     response = Mock()
     response.status_code = 200
     response.content = b"mock_content_data"
+    response.iter_content.return_value = [response.content]
     return response
 
 
@@ -38,3 +45,73 @@ def mock_error_response():
     response = Mock()
     response.status_code = 404
     return response
+
+
+@pytest.fixture
+def mock_shared_session() -> Generator[Mock, None, None]:
+    """Fixture replacing the HTTP session shared by the module-level download functions."""
+    session = Mock()
+    with patch("src.py_adsb_historical_data_client.historical._get_shared_session", return_value=session):
+        yield session
+
+
+@pytest.fixture
+def mock_batch_session() -> Generator[MagicMock, None, None]:
+    """
+    Fixture replacing the HTTP session created by the batch downloads.
+
+    Every URL is answered with its last path segment, with the status code found for
+    that segment in the session's status_codes dictionary, 200 by default.
+    """
+
+    def get(url: str, **kwargs: Any) -> Mock:
+        name = url.rsplit("/", 1)[-1]
+        response = Mock()
+        response.status_code = session.status_codes.get(name, 200)
+        response.content = name.encode()
+        response.iter_content.return_value = [response.content]
+        return response
+
+    session = MagicMock()
+    session.__enter__.return_value = session
+    session.headers = {}
+    session.status_codes = {}
+    session.get.side_effect = get
+    with patch("requests.Session", return_value=session):
+        yield session
+
+
+class FakeTransport(BaseAdapter):
+    """
+    A transport adapter answering every request with a 200 response carrying its URL's last segment.
+
+    Mounted on a real session, it exercises the actual request and response code paths
+    without any network access, and records the requested URLs.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.urls: list[str] = []
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        url = str(request.url)
+        self.urls.append(url)
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.request = request
+        response.raw = io.BytesIO(url.rsplit("/", 1)[-1].encode())
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_transport() -> Generator[FakeTransport, None, None]:
+    """Fixture serving the module-level downloads from a FakeTransport installed once for the whole test."""
+    transport = FakeTransport()
+    with requests.Session() as session:
+        session.mount("https://", transport)
+        with patch("src.py_adsb_historical_data_client.historical._get_shared_session", return_value=session):
+            yield transport
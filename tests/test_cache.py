@@ -2,8 +2,14 @@
 Tests for the cache module.
 """
 
+import mmap
+import os
+from collections.abc import Iterator
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
+
+import pytest
 
 from src.py_adsb_historical_data_client.cache import (
     Cache,
@@ -59,6 +65,170 @@ class TestCache:
         assert expected_path.exists()
         assert expected_path.read_bytes() == test_data
 
+    def test_heatmap_mmap_hit(self, tmp_path: Path) -> None:
+        """Test that a cached heatmap can be read through a memory map."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        test_data = b"heatmap_test_data"
+
+        cache.put_heatmap(timestamp, test_data)
+
+        mapped = cache.get_heatmap_mmap(timestamp)
+        assert mapped is not None
+        with mapped:
+            assert mapped[:] == test_data
+
+    def test_heatmap_mmap_miss(self, tmp_path: Path) -> None:
+        """Test that get_heatmap_mmap returns None for uncached or empty data."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+
+        assert cache.get_heatmap_mmap(timestamp) is None
+
+        cache.put_heatmap(timestamp, b"")
+        assert cache.get_heatmap_mmap(timestamp) is None
+
+    def test_heatmap_buffer_prefers_memory_layer(self, tmp_path: Path) -> None:
+        """Test that get_heatmap_buffer returns in-memory heatmaps as bytes and maps the others."""
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        cache = Cache(tmp_path / "cache")
+        cache.put_heatmap(timestamp, b"heatmap")
+
+        assert cache.get_heatmap_buffer(timestamp) == b"heatmap"
+
+        mapped = Cache(tmp_path / "cache").get_heatmap_buffer(timestamp)
+        assert isinstance(mapped, mmap.mmap)
+        with mapped:
+            assert mapped[:] == b"heatmap"
+        assert Cache(tmp_path / "other").get_heatmap_buffer(timestamp) is None
+
+    def test_heatmap_as_memoryview(self, tmp_path: Path) -> None:
+        """Test reading small and large cached heatmaps as memoryviews."""
+        cache = Cache(tmp_path / "cache", memory_cache_max_bytes=0)
+        small, large = datetime(2023, 6, 15, 14, 0), datetime(2023, 6, 15, 14, 45)
+        large_data = bytes(range(256)) * 1024
+        cache.put_heatmap(small, b"small")
+        cache.put_heatmap(large, large_data)
+
+        small_view = cache.get_heatmap(small, as_memoryview=True)
+        large_view = cache.get_heatmap(large, as_memoryview=True)
+
+        assert isinstance(small_view, memoryview)
+        assert small_view.tobytes() == b"small"
+        assert isinstance(large_view, memoryview)
+        assert isinstance(large_view.obj, mmap.mmap)
+        assert large_view.tobytes() == large_data
+        assert cache.get_heatmap(datetime(2023, 6, 16), as_memoryview=True) is None
+
+    def test_trace_as_memoryview(self, tmp_path: Path) -> None:
+        """Test reading a cached trace as a memoryview."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        cache.put_trace("ABC123", timestamp, b'{"icao": "abc123"}')
+
+        view = cache.get_trace("ABC123", timestamp, as_memoryview=True)
+
+        assert isinstance(view, memoryview)
+        assert view.tobytes() == b'{"icao": "abc123"}'
+        assert cache.get_trace("DEF456", timestamp, as_memoryview=True) is None
+
+    def test_put_overwrites_atomically_without_leftovers(self, tmp_path: Path) -> None:
+        """Test that rewriting an entry replaces it whole and leaves no temporary file behind."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+
+        cache.put_heatmap(timestamp, b"first")
+        cache.put_heatmap(timestamp, b"second")
+
+        assert cache.get_heatmap(timestamp) == b"second"
+        day_dir = tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15"
+        assert [p.name for p in day_dir.iterdir()] == ["29.bin.ttf"]
+
+    def test_put_heatmap_stream(self, tmp_path: Path) -> None:
+        """Test storing a heatmap from a stream of chunks."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+
+        assert cache.put_heatmap_stream(timestamp, iter([b"ab", b"", b"cd"])) == b"abcd"
+        assert cache.get_heatmap(timestamp) == b"abcd"
+
+    def test_failed_stream_leaves_no_entry(self, tmp_path: Path) -> None:
+        """Test that a stream interrupted midway neither stores an entry nor leaves a temporary file."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+
+        def chunks() -> Iterator[bytes]:
+            yield b"partial"
+            raise ConnectionError("connection reset")
+
+        with pytest.raises(ConnectionError):
+            cache.put_heatmap_stream(timestamp, chunks())
+
+        assert not cache.has_heatmap(timestamp)
+        day_dir = tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15"
+        assert list(day_dir.iterdir()) == []
+
+    def test_put_large_trace(self, tmp_path: Path) -> None:
+        """Test that multi-megabyte entries are written completely."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        data = bytes(range(256)) * (12 * 1024)
+
+        cache.put_trace("ABC123", timestamp, data)
+
+        assert cache.get_trace("ABC123", timestamp) == data
+
+    def test_failed_put_keeps_previous_entry(self, tmp_path: Path) -> None:
+        """Test that a write failing midway neither corrupts the entry nor leaves a temporary file."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        cache.put_trace("ABC123", timestamp, b"original")
+
+        with patch("src.py_adsb_historical_data_client.cache.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                cache.put_trace("ABC123", timestamp, b"replacement")
+
+        assert cache.get_trace("ABC123", timestamp) == b"original"
+        trace_dir = tmp_path / "cache" / "traces" / "2023" / "06" / "15" / "23"
+        assert [p.name for p in trace_dir.iterdir()] == ["trace_full_abc123.json"]
+
+    def test_heatmap_served_from_memory(self, tmp_path: Path) -> None:
+        """Test that recently used heatmaps are served from memory without touching the disk."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        cache.put_heatmap(timestamp, b"heatmap")
+
+        (tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15" / "29.bin.ttf").unlink()
+
+        assert cache.get_heatmap(timestamp) == b"heatmap"
+
+    def test_memory_cache_evicts_least_recently_used_by_size(self, tmp_path: Path) -> None:
+        """Test that the in-memory layer evicts the least recently used heatmaps to fit its byte budget."""
+        cache = Cache(tmp_path / "cache", memory_cache_max_bytes=10)
+        first, second, third = (datetime(2023, 6, 15, hour) for hour in (1, 2, 3))
+
+        cache.put_heatmap(first, b"1111")
+        cache.put_heatmap(second, b"2222")
+        cache.get_heatmap(first)  # first becomes the most recently used
+        cache.put_heatmap(third, b"3333")  # 12 bytes > 10: evicts second
+
+        for path in (tmp_path / "cache" / "heatmaps").rglob("*.bin.ttf"):
+            path.unlink()
+
+        assert cache.get_heatmap(first) == b"1111"
+        assert cache.get_heatmap(second) is None
+        assert cache.get_heatmap(third) == b"3333"
+
+    def test_memory_cache_can_be_disabled(self, tmp_path: Path) -> None:
+        """Test that a zero byte budget disables the in-memory layer."""
+        cache = Cache(tmp_path / "cache", memory_cache_max_bytes=0)
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        cache.put_heatmap(timestamp, b"heatmap")
+
+        (tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15" / "29.bin.ttf").unlink()
+
+        assert cache.get_heatmap(timestamp) is None
+
     def test_trace_cache_miss(self, tmp_path: Path) -> None:
         """Test that get_trace returns None for uncached data."""
         cache = Cache(tmp_path / "cache")
@@ -97,6 +267,54 @@ class TestCache:
         assert expected_path.exists()
         assert expected_path.read_bytes() == test_data
 
+    def test_trace_stored_compressed(self, tmp_path: Path) -> None:
+        """Test that traces are stored zstd-compressed and read back unchanged."""
+        zstandard = pytest.importorskip("zstandard")
+        cache = Cache(tmp_path / "cache", compress_traces=True)
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        test_data = b'{"icao": "abc123", "trace": [[0, 48.8566, 2.3522, 35000]]}' * 100
+
+        cache.put_trace("ABC123", timestamp, test_data)
+
+        trace_dir = tmp_path / "cache" / "traces" / "2023" / "06" / "15" / "23"
+        compressed = (trace_dir / "trace_full_abc123.json.zst").read_bytes()
+        assert zstandard.ZstdDecompressor().decompress(compressed) == test_data
+        assert len(compressed) < len(test_data)
+        assert cache.get_trace("ABC123", timestamp) == test_data
+        assert bytes(cache.get_trace("ABC123", timestamp, as_memoryview=True)) == test_data
+        assert cache.get_cache_stats()["trace_size_bytes"] == len(compressed)
+
+    def test_compressed_cache_reads_and_replaces_legacy_traces(self, tmp_path: Path) -> None:
+        """Test that uncompressed traces are still served, and replaced by compressed ones on put."""
+        pytest.importorskip("zstandard")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        Cache(tmp_path / "cache", compress_traces=False).put_trace("ABC123", timestamp, b"legacy")
+
+        cache = Cache(tmp_path / "cache", compress_traces=True)
+        assert cache.has_trace("ABC123", timestamp)
+        assert cache.get_trace("ABC123", timestamp) == b"legacy"
+
+        cache.put_trace("ABC123", timestamp, b"fresh")
+
+        trace_dir = tmp_path / "cache" / "traces" / "2023" / "06" / "15" / "23"
+        assert [p.name for p in trace_dir.iterdir()] == ["trace_full_abc123.json.zst"]
+        assert cache.get_trace("ABC123", timestamp) == b"fresh"
+        assert cache.get_cache_stats()["trace_count"] == 1
+
+    def test_compressed_traces_ignored_without_zstandard(self, tmp_path: Path) -> None:
+        """Test that compressed traces are not reported as cached where they cannot be read."""
+        pytest.importorskip("zstandard")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        Cache(tmp_path / "cache", compress_traces=True).put_trace("ABC123", timestamp, b"compressed")
+
+        with patch("src.py_adsb_historical_data_client.cache.ZSTD_AVAILABLE", False):
+            cache = Cache(tmp_path / "cache")
+            assert not cache.has_trace("ABC123", timestamp)
+            assert cache.get_trace("ABC123", timestamp) is None
+            assert cache.get_cache_stats()["trace_count"] == 0
+            with pytest.raises(ImportError):
+                Cache(tmp_path / "cache", compress_traces=True)
+
     def test_trace_icao_case_insensitive(self, tmp_path: Path) -> None:
         """Test that ICAO codes are normalized to lowercase."""
         cache = Cache(tmp_path / "cache")
@@ -146,6 +364,147 @@ class TestCache:
         assert stats["heatmap_size_bytes"] == len(b"heatmap_data")
         assert stats["trace_size_bytes"] == len(b"trace_data")
 
+    def test_cache_stats_across_days_ignores_other_files(self, tmp_path: Path) -> None:
+        """Test that stats walk nested day folders and only count cache files."""
+        cache = Cache(tmp_path / "cache")
+
+        cache.put_heatmap(datetime(2023, 6, 15, 14, 45), b"a")
+        cache.put_heatmap(datetime(2023, 7, 1, 0, 0), b"bb")
+        cache.put_trace("ABC123", datetime(2023, 6, 15), b"ccc")
+        cache.put_trace("DEF456", datetime(2024, 1, 2), b"dddd")
+        (tmp_path / "cache" / "heatmaps" / "notes.txt").write_bytes(b"ignored")
+
+        stats = cache.get_cache_stats()
+        assert stats["heatmap_count"] == 2
+        assert stats["trace_count"] == 2
+        assert stats["heatmap_size_bytes"] == 3
+        assert stats["trace_size_bytes"] == 7
+        assert stats["total_size_bytes"] == 10
+        assert cache.get_cache_size() == 10 + len(b"ignored")
+
+    def test_cache_stats_kept_in_memory_after_first_scan(self, tmp_path: Path) -> None:
+        """Test that stats follow puts and overwrites without rescanning the cache directory."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        cache.put_heatmap(timestamp, b"heatmap")
+        assert cache.get_cache_stats()["heatmap_count"] == 1
+
+        with patch("src.py_adsb_historical_data_client.cache._CacheIndex.scan") as scan:
+            cache.put_heatmap(timestamp, b"hm")
+            cache.put_trace("ABC123", timestamp, b"trace")
+            cache.put_trace("ABC123", timestamp, b"longer_trace")
+            stats = cache.get_cache_stats()
+            scan.assert_not_called()
+
+        assert stats == {
+            "heatmap_count": 1,
+            "trace_count": 1,
+            "heatmap_size_bytes": 2,
+            "trace_size_bytes": 12,
+            "total_size_bytes": 14,
+        }
+
+        cache.clear()
+        assert cache.get_cache_stats()["total_size_bytes"] == 0
+
+    def test_has_checks_use_index_until_refresh(self, tmp_path: Path) -> None:
+        """Test that has_* answer from the index, and refresh() picks up external changes."""
+        cache = Cache(tmp_path / "cache")
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        cache.put_heatmap(timestamp, b"heatmap")
+        cache.put_trace("ABC123", timestamp, b"trace")
+
+        # Entries stored before the first scan are found on disk
+        assert cache.has_heatmap(timestamp)
+        assert cache.has_trace("abc123", timestamp)
+        assert not cache.has_trace("DEF456", timestamp)
+
+        # Entries written by another instance are only seen after a refresh
+        Cache(tmp_path / "cache").put_trace("DEF456", timestamp, b"other")
+        assert not cache.has_trace("DEF456", timestamp)
+        cache.refresh()
+        assert cache.has_trace("DEF456", timestamp)
+        assert cache.get_cache_stats()["trace_count"] == 2
+
+    def test_bounded_cache_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        """Test that puts beyond max_size_bytes delete the least recently used entries."""
+        cache = Cache(tmp_path / "cache", max_size_bytes=25)
+        first, second, third = datetime(2023, 6, 15, 0, 0), datetime(2023, 6, 15, 0, 30), datetime(2023, 6, 15, 1, 0)
+        cache.put_heatmap(first, b"0123456789")
+        cache.put_heatmap(second, b"0123456789")
+        # Reading the first heatmap makes the second one the least recently used
+        assert cache.get_heatmap(first) == b"0123456789"
+
+        cache.put_trace("ABC123", third, b"0123456789")
+
+        assert cache.has_heatmap(first)
+        assert not cache.has_heatmap(second)
+        assert cache.get_heatmap(second) is None
+        assert not (tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15" / "1.bin.ttf").exists()
+        assert cache.has_trace("ABC123", third)
+        assert cache.get_cache_stats()["total_size_bytes"] == 20
+
+    def test_bounded_cache_evicts_only_what_is_needed(self, tmp_path: Path) -> None:
+        """Test that a put on a full cache deletes just enough least recently used entries."""
+        cache = Cache(tmp_path / "cache", max_size_bytes=100)
+        timestamps = [datetime(2023, 6, 15, hour) for hour in range(11)]
+        for timestamp in timestamps[:10]:
+            cache.put_heatmap(timestamp, b"0123456789")
+
+        with patch.object(Cache, "_evict", autospec=True, side_effect=Cache._evict) as evict:
+            cache.put_heatmap(timestamps[10], b"0123456789")
+
+        assert [call.args[1] for call in evict.call_args_list] == [(2023, 6, 15, 0)]
+        assert [cache.has_heatmap(timestamp) for timestamp in timestamps] == [False] + [True] * 10
+        assert cache.get_cache_stats()["total_size_bytes"] == 100
+
+    def test_bounded_cache_keeps_entries_it_cannot_delete(self, tmp_path: Path) -> None:
+        """Test that a file failing to be deleted stays indexed, and the next entry is evicted instead."""
+        cache = Cache(tmp_path / "cache", max_size_bytes=25)
+        first, second, third = datetime(2023, 6, 15, 0, 0), datetime(2023, 6, 15, 0, 30), datetime(2023, 6, 15, 1, 0)
+        cache.put_heatmap(first, b"0123456789")
+        cache.put_heatmap(second, b"0123456789")
+        locked_path = str(tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15" / "0.bin.ttf")
+        remove = os.remove
+
+        def remove_unless_locked(path: str) -> None:
+            if path == locked_path:
+                raise PermissionError("file in use")
+            remove(path)
+
+        with patch("src.py_adsb_historical_data_client.cache.os.remove", side_effect=remove_unless_locked):
+            cache.put_heatmap(third, b"0123456789")
+
+        assert cache.has_heatmap(first)
+        assert not cache.has_heatmap(second)
+        assert cache.has_heatmap(third)
+        assert cache.get_cache_stats()["total_size_bytes"] == cache.get_cache_size() == 20
+
+    def test_bounded_cache_keeps_single_oversized_entry(self, tmp_path: Path) -> None:
+        """Test that an entry larger than the budget evicts everything else but is kept itself."""
+        cache = Cache(tmp_path / "cache", max_size_bytes=5)
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        cache.put_trace("ABC123", timestamp, b"abc")
+
+        cache.put_trace("DEF456", timestamp, b"0123456789")
+
+        assert not cache.has_trace("ABC123", timestamp)
+        assert cache.get_trace("DEF456", timestamp) == b"0123456789"
+
+    def test_bounded_cache_orders_existing_files_by_mtime(self, tmp_path: Path) -> None:
+        """Test that entries found on disk are evicted oldest first."""
+        old, recent = datetime(2023, 6, 15, 0, 0), datetime(2023, 6, 15, 0, 30)
+        Cache(tmp_path / "cache").put_heatmap(recent, b"0123456789")
+        Cache(tmp_path / "cache").put_heatmap(old, b"0123456789")
+        old_path = tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15" / "0.bin.ttf"
+        os.utime(old_path, (1_000_000_000, 1_000_000_000))
+
+        cache = Cache(tmp_path / "cache", max_size_bytes=25)
+        cache.put_trace("ABC123", recent, b"0123456789")
+
+        assert not cache.has_heatmap(old)
+        assert cache.has_heatmap(recent)
+
     def test_cache_size(self, tmp_path: Path) -> None:
         """Test total cache size calculation."""
         cache = Cache(tmp_path / "cache")
@@ -1,19 +1,37 @@
-from datetime import datetime
+import json
+import math
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
 from unittest.mock import Mock, patch
 
+import numpy as np
 import pytest
 import requests
+from pyreadsb.heatmap_decoder import HeatmapDecoder
 
+from src.py_adsb_historical_data_client.cache import Cache, disable_cache, set_cache
 from src.py_adsb_historical_data_client.historical import (
     ADSBEXCHANGE_HISTORICAL_DATA_URL,
     DownloadError,
     FullHeatmapEntry,
     HTTPError,
+    TraceSession,
+    _get_shared_session,
     download_heatmap,
+    download_heatmaps_batch,
     download_traces,
+    download_traces_batch,
     get_heatmap,
+    get_heatmap_batch,
+    get_heatmap_entries,
     get_traces,
+    get_traces_filtered,
+    get_zoned_heatmap_entries,
     haversine_distance,
+    haversine_distance_batch,
     is_valid_location,
 )
 from src.py_adsb_historical_data_client.logger_config import setup_logger
@@ -25,24 +43,47 @@ logger = setup_logger(__name__)
 class TestDownloadHeatmap:
     """Test cases for the download_heatmap function."""
 
-    def test_successful_heatmap_download(self, sample_timestamp, mock_successful_response):
+    def test_successful_heatmap_download(self, sample_timestamp, mock_successful_response, mock_shared_session):
         """Test successful heatmap download with valid response."""
         # Arrange
         timestamp = sample_timestamp
         expected_content = mock_successful_response.content
         expected_url = f"{ADSBEXCHANGE_HISTORICAL_DATA_URL}2023/06/15/heatmap/29.bin.ttf"
+        mock_shared_session.get.return_value = mock_successful_response
 
-        # Act & Assert
-        with patch("requests.get", return_value=mock_successful_response) as mock_get:
-            result = download_heatmap(timestamp)
+        # Act
+        result = download_heatmap(timestamp)
+
+        # Verify the correct URL was called
+        mock_shared_session.get.assert_called_once_with(expected_url, timeout=30.0, stream=True)
+
+        # Verify the correct content was returned and the streamed response released
+        assert result == expected_content
+        mock_successful_response.close.assert_called_once()
 
-            # Verify the correct URL was called
-            mock_get.assert_called_once_with(expected_url, timeout=30.0)
+    def test_heatmap_download_joins_streamed_chunks(self, sample_timestamp, mock_shared_session):
+        """Test that a heatmap streamed in several chunks is returned whole."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_content.return_value = [b"chunk1", b"chunk2", b"chunk3"]
+        mock_shared_session.get.return_value = mock_response
 
-            # Verify the correct content was returned
-            assert result == expected_content
+        assert download_heatmap(sample_timestamp) == b"chunk1chunk2chunk3"
+        mock_response.iter_content.assert_called_once_with(64 * 1024)
 
-    def test_heatmap_download_with_hour_rounding(self):
+    def test_heatmap_download_streams_into_cache(self, sample_timestamp, mock_shared_session, tmp_path):
+        """Test that a streamed heatmap is written to the cache and returned whole."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.iter_content.return_value = iter([b"chunk1", b"chunk2"])
+        mock_shared_session.get.return_value = mock_response
+        cache = Cache(tmp_path / "cache")
+
+        assert download_heatmap(sample_timestamp, cache=cache) == b"chunk1chunk2"
+        assert cache.has_heatmap(sample_timestamp)
+        assert (tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15" / "29.bin.ttf").read_bytes() == b"chunk1chunk2"
+
+    def test_heatmap_download_with_hour_rounding(self, fake_transport):
         """Test that minutes are correctly rounded to nearest 30-minute interval."""
         test_cases = [
             (datetime(2023, 6, 15, 14, 0), "28.bin.ttf"),  # 0 minutes -> 0
@@ -54,56 +95,93 @@ class TestDownloadHeatmap:
         ]
 
         for timestamp, expected_filename in test_cases:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.content = b"test_data"
+            # The fake transport answers with the filename part of the requested URL
+            assert download_heatmap(timestamp) == expected_filename.encode()
 
-            with patch("requests.get", return_value=mock_response) as mock_get:
-                download_heatmap(timestamp)
+        assert len(fake_transport.urls) == len(test_cases)
 
-                # Extract the called URL and check the filename part
-                called_url = mock_get.call_args[0][0]
-                assert called_url.endswith(expected_filename)
-
-    def test_heatmap_download_date_formatting(self):
+    def test_heatmap_download_date_formatting(self, mock_shared_session):
         """Test that dates are correctly formatted in the URL."""
         timestamp = datetime(2023, 1, 5, 12, 0)  # Single digit month and day
         expected_url = f"{ADSBEXCHANGE_HISTORICAL_DATA_URL}2023/01/05/heatmap/24.bin.ttf"
 
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.content = b"test_data"
+        mock_response.iter_content.return_value = [b"test_data"]
+        mock_shared_session.get.return_value = mock_response
 
-        with patch("requests.get", return_value=mock_response) as mock_get:
-            download_heatmap(timestamp)
-            mock_get.assert_called_once_with(expected_url, timeout=30.0)
+        download_heatmap(timestamp)
+        mock_shared_session.get.assert_called_once_with(expected_url, timeout=30.0, stream=True)
 
-    def test_heatmap_download_http_error(self, sample_timestamp, mock_error_response):
+    def test_heatmap_download_http_error(self, sample_timestamp, mock_error_response, mock_shared_session):
         """Test that HTTP errors are properly handled."""
-        with patch("requests.get", return_value=mock_error_response):
-            with pytest.raises(HTTPError) as exc_info:
-                download_heatmap(sample_timestamp)
+        mock_shared_session.get.return_value = mock_error_response
 
-            assert exc_info.value.status_code == 404
-            assert "Failed to download heatmap" in str(exc_info.value)
+        with pytest.raises(HTTPError) as exc_info:
+            download_heatmap(sample_timestamp)
 
-    def test_heatmap_download_server_error(self, sample_timestamp):
+        assert exc_info.value.status_code == 404
+        assert "Failed to download heatmap" in str(exc_info.value)
+
+    def test_heatmap_download_server_error(self, sample_timestamp, mock_shared_session):
         """Test handling of server errors (5xx status codes)."""
         mock_response = Mock()
         mock_response.status_code = 500
+        mock_shared_session.get.return_value = mock_response
 
-        with patch("requests.get", return_value=mock_response):
-            with pytest.raises(HTTPError) as exc_info:
-                download_heatmap(sample_timestamp)
+        with pytest.raises(HTTPError) as exc_info:
+            download_heatmap(sample_timestamp)
 
-            assert exc_info.value.status_code == 500
-            assert "Failed to download heatmap" in str(exc_info.value)
+        assert exc_info.value.status_code == 500
+        assert "Failed to download heatmap" in str(exc_info.value)
 
-    def test_heatmap_download_requests_exception(self, sample_timestamp):
+    def test_heatmap_download_requests_exception(self, sample_timestamp, mock_shared_session):
         """Test handling of network-level exceptions."""
-        with patch("requests.get", side_effect=requests.RequestException("Network error")):
-            with pytest.raises(DownloadError):
-                download_heatmap(sample_timestamp)
+        mock_shared_session.get.side_effect = requests.RequestException("Network error")
+
+        with pytest.raises(DownloadError):
+            download_heatmap(sample_timestamp)
+
+    def test_get_heatmap_decodes_cached_file_without_download(self, sample_timestamp, tmp_path: Path):
+        """Test that get_heatmap decodes a cached heatmap from its memory map."""
+        heat_entry = struct.Struct("<IiiHH")
+        data = heat_entry.pack(HeatmapDecoder.MAGIC_NUMBER, 0, 1000, 0, 0) + heat_entry.pack(
+            0xABC123, 48_856_600, 2_352_200, 1400, 4505
+        )
+
+        # Stored by another instance, so the heatmap is only on disk
+        Cache(tmp_path / "cache").put_heatmap(sample_timestamp, data)
+        try:
+            set_cache(tmp_path / "cache")
+
+            with patch("src.py_adsb_historical_data_client.historical.download_heatmap") as mock_download:
+                entries = list(get_heatmap(sample_timestamp))
+
+            mock_download.assert_not_called()
+        finally:
+            disable_cache()
+
+        assert entries == list(HeatmapDecoder().decode_from_bytes(data))
+        assert entries[1] == HeatmapDecoder.HeatEntry("abc123", 48.8566, 2.3522, 35000, 450.5)
+
+    def test_get_heatmap_served_from_memory_cache(self, sample_timestamp, tmp_path: Path):
+        """Test that get_heatmap decodes a heatmap held in the cache's memory layer without reading the disk."""
+        heat_entry = struct.Struct("<IiiHH")
+        data = heat_entry.pack(0xABC123, 48_856_600, 2_352_200, 1400, 4505)
+
+        try:
+            cache = set_cache(tmp_path / "cache")
+            cache.put_heatmap(sample_timestamp, data)
+            (tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15" / "29.bin.ttf").unlink()
+
+            with patch("src.py_adsb_historical_data_client.historical.download_heatmap") as mock_download:
+                entries = list(get_heatmap(sample_timestamp))
+
+            mock_download.assert_not_called()
+        finally:
+            disable_cache()
+
+        assert entries == [HeatmapDecoder.HeatEntry("abc123", 48.8566, 2.3522, 35000, 450.5)]
 
     @pytest.mark.integration
     def test_download_real_heatmap(self):
@@ -125,68 +203,71 @@ class TestDownloadHeatmap:
 class TestDownloadTrace:
     """Test cases for the download_trace function."""
 
-    def test_trace_download_http_error(self, sample_icao, sample_timestamp, mock_error_response):
+    def test_trace_download_http_error(self, sample_icao, sample_timestamp, mock_error_response, mock_shared_session):
         """Test that HTTP errors are properly handled."""
-        mock_session = Mock()
-        mock_session.get.return_value = mock_error_response
-        mock_session.__enter__ = Mock(return_value=mock_session)
-        mock_session.__exit__ = Mock(return_value=None)
+        mock_shared_session.get.return_value = mock_error_response
 
-        with patch("requests.Session", return_value=mock_session):
-            with pytest.raises(HTTPError) as exc_info:
-                download_traces(sample_icao, sample_timestamp)
+        with pytest.raises(HTTPError) as exc_info:
+            download_traces(sample_icao, sample_timestamp)
 
-            assert exc_info.value.status_code == 404
-            assert "Failed to download trace" in str(exc_info.value)
+        assert exc_info.value.status_code == 404
+        assert "Failed to download trace" in str(exc_info.value)
 
-    def test_trace_download_server_error(self, sample_icao, sample_timestamp):
+    def test_trace_download_server_error(self, sample_icao, sample_timestamp, mock_shared_session):
         """Test handling of server errors (5xx status codes)."""
         mock_response = Mock()
         mock_response.status_code = 500
+        mock_shared_session.get.return_value = mock_response
 
-        mock_session = Mock()
-        mock_session.get.return_value = mock_response
-        mock_session.__enter__ = Mock(return_value=mock_session)
-        mock_session.__exit__ = Mock(return_value=None)
-
-        with patch("requests.Session", return_value=mock_session):
-            with pytest.raises(HTTPError) as exc_info:
-                download_traces(sample_icao, sample_timestamp)
+        with pytest.raises(HTTPError) as exc_info:
+            download_traces(sample_icao, sample_timestamp)
 
-            assert exc_info.value.status_code == 500
-            assert "Failed to download trace" in str(exc_info.value)
+        assert exc_info.value.status_code == 500
+        assert "Failed to download trace" in str(exc_info.value)
 
-    def test_trace_download_requests_exception(self, sample_icao, sample_timestamp) -> None:
+    def test_trace_download_requests_exception(self, sample_icao, sample_timestamp, mock_shared_session) -> None:
         """Test handling of network-level exceptions."""
-        mock_session = Mock()
-        mock_session.get.side_effect = requests.RequestException("Network error")
-        mock_session.__enter__ = Mock(return_value=mock_session)
-        mock_session.__exit__ = Mock(return_value=None)
+        mock_shared_session.get.side_effect = requests.RequestException("Network error")
 
-        with patch("requests.Session", return_value=mock_session):
-            with pytest.raises(DownloadError):
-                download_traces(sample_icao, sample_timestamp)
+        with pytest.raises(DownloadError):
+            download_traces(sample_icao, sample_timestamp)
 
-    def test_trace_short_icao_code(self, sample_timestamp) -> None:
+    def test_trace_short_icao_code(self, sample_timestamp, mock_shared_session) -> None:
         """Test handling of short ICAO codes (less than 2 characters)."""
         icao = "A"
 
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.content = b"test_data"
+        mock_shared_session.get.return_value = mock_response
 
-        mock_session = Mock()
-        mock_session.get.return_value = mock_response
-        mock_session.__enter__ = Mock(return_value=mock_session)
-        mock_session.__exit__ = Mock(return_value=None)
+        download_traces(icao, sample_timestamp)
+
+        called_url = mock_shared_session.get.call_args[0][0]
+        # Should use the single character as subfolder
+        assert "traces/a/" in called_url
+        assert "trace_full_a.json" in called_url
+
+    def test_trace_download_date_formatting(self, mock_shared_session) -> None:
+        """Test that dates are zero-padded in the trace URL, as strftime("%Y/%m/%d") would."""
+        timestamp = datetime(987, 1, 5, 12, 0)
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = b"test_data"
+        mock_shared_session.get.return_value = mock_response
 
-        with patch("requests.Session", return_value=mock_session):
-            download_traces(icao, sample_timestamp)
+        download_traces("ABC123", timestamp)
 
-            called_url = mock_session.get.call_args[0][0]
-            # Should use the single character as subfolder
-            assert "traces/a/" in called_url
-            assert "trace_full_a.json" in called_url
+        called_url = mock_shared_session.get.call_args[0][0]
+        assert called_url == f"{ADSBEXCHANGE_HISTORICAL_DATA_URL}0987/01/05/traces/23/trace_full_abc123.json"
+
+    def test_shared_session_is_reused(self) -> None:
+        """Test that the module-level downloads share a single pooled session."""
+        session = _get_shared_session()
+
+        assert _get_shared_session() is session
+        assert session.headers["Referer"] == "https://globe.adsbexchange.com/"
+        assert session.get_adapter(ADSBEXCHANGE_HISTORICAL_DATA_URL).max_retries.total == 3
 
     @pytest.mark.integration
     def test_trace_real_download(self) -> None:
@@ -204,6 +285,154 @@ class TestDownloadTrace:
             pytest.skip(f"Integration test skipped due to network/data availability: {e}")
 
 
+class TestGetTracesFiltered:
+    """Test cases for the get_traces_filtered function."""
+
+    def test_keeps_entries_within_radius(self) -> None:
+        """Test that only the trace entries within radius of the center are yielded, in order."""
+        center = (48.8566, 2.3522)
+        points = [(48.8566, 2.3522), (51.5074, -0.1278), (48.8600, 2.3500), (48.8566, -177.6478), (48.95, 2.3522)]
+        trace = {
+            "icao": "abc123",
+            "timestamp": 1686839400.0,
+            "trace": [
+                [offset, lat, lon, 35000, 450.5, 90.0, 0, 0, None, "adsb_icao", None, None, None, None]
+                for offset, (lat, lon) in enumerate(points)
+            ],
+        }
+
+        with patch(
+            "src.py_adsb_historical_data_client.historical.download_traces", return_value=json.dumps(trace).encode()
+        ):
+            entries = list(get_traces_filtered("ABC123", datetime(2023, 6, 15), center, 10_000))
+
+        expected = [point for point in points if haversine_distance(center, point) <= 10_000]
+        assert [(entry.latitude, entry.longitude) for entry in entries] == expected == [points[0], points[2]]
+        assert [entry.timestamp.second for entry in entries] == [0, 2]
+
+
+class TestDownloadHeatmapsBatch:
+    """Test cases for the download_heatmaps_batch function."""
+
+    def test_downloads_all_heatmaps(self, mock_batch_session) -> None:
+        """Test that every requested timestamp is downloaded and mapped to its data."""
+        timestamps = [datetime(2023, 6, 15, 0, 0), datetime(2023, 6, 15, 0, 30), datetime(2023, 6, 15, 14, 45)]
+
+        result = download_heatmaps_batch(timestamps, max_workers=2)
+
+        assert result == {
+            timestamps[0]: b"0.bin.ttf",
+            timestamps[1]: b"1.bin.ttf",
+            timestamps[2]: b"29.bin.ttf",
+        }
+        assert mock_batch_session.get.call_count == len(timestamps)
+
+    def test_cached_heatmaps_are_not_downloaded(self, mock_batch_session, tmp_path: Path) -> None:
+        """Test that heatmaps already in the cache skip the network."""
+        cache = Cache(tmp_path / "cache")
+        cached, missing = datetime(2023, 6, 15, 0, 0), datetime(2023, 6, 15, 0, 30)
+        cache.put_heatmap(cached, b"cached")
+
+        result = download_heatmaps_batch([cached, missing], cache=cache)
+
+        assert result == {cached: b"cached", missing: b"1.bin.ttf"}
+        mock_batch_session.get.assert_called_once()
+        assert cache.get_heatmap(missing) == b"1.bin.ttf"
+
+    def test_failed_download_cancels_pending_downloads(self, mock_batch_session) -> None:
+        """Test that the first failure is raised without running the downloads not started yet."""
+        mock_batch_session.status_codes["0.bin.ttf"] = 500
+        get = mock_batch_session.get.side_effect
+
+        def slow_get(url: str, **kwargs) -> Mock:
+            if not url.endswith("/0.bin.ttf"):
+                time.sleep(0.05)
+            return get(url, **kwargs)
+
+        mock_batch_session.get.side_effect = slow_get
+        timestamps = [datetime(2023, 6, 15, hour, minute) for hour in range(10) for minute in (0, 30)]
+
+        with pytest.raises(HTTPError):
+            download_heatmaps_batch(timestamps, max_workers=1)
+
+        assert mock_batch_session.get.call_count <= 2
+
+
+class TestDownloadTracesBatch:
+    """Test cases for the download_traces_batch function."""
+
+    def test_downloads_all_traces(self, mock_batch_session, sample_timestamp) -> None:
+        """Test that every requested ICAO is downloaded and mapped to its data."""
+        icaos = ["abc123", "def456", "a1b2c3"]
+
+        result = download_traces_batch(icaos, sample_timestamp, max_workers=2)
+
+        assert result == {icao: f"trace_full_{icao}.json".encode() for icao in icaos}
+        assert mock_batch_session.get.call_count == len(icaos)
+
+    def test_cached_traces_are_not_downloaded(self, mock_batch_session, sample_timestamp, tmp_path: Path) -> None:
+        """Test that traces already in the cache skip the network."""
+        cache = Cache(tmp_path / "cache")
+        cache.put_trace("abc123", sample_timestamp, b"cached")
+
+        result = download_traces_batch(["abc123", "def456"], sample_timestamp, cache=cache)
+
+        assert result == {"abc123": b"cached", "def456": b"trace_full_def456.json"}
+        mock_batch_session.get.assert_called_once()
+
+    def test_missing_traces_are_skipped(self, mock_batch_session, sample_timestamp) -> None:
+        """Test that aircraft without a trace are left out instead of failing the batch."""
+        mock_batch_session.status_codes["trace_full_def456.json"] = 404
+
+        result = download_traces_batch(["abc123", "def456", "a1b2c3"], sample_timestamp, max_workers=2)
+
+        assert result == {"abc123": b"trace_full_abc123.json", "a1b2c3": b"trace_full_a1b2c3.json"}
+
+    def test_failed_download_raises(self, mock_batch_session, sample_timestamp) -> None:
+        """Test that a failing download other than a missing trace is reported to the caller."""
+        mock_batch_session.status_codes["trace_full_def456.json"] = 500
+
+        with pytest.raises(HTTPError) as exc_info:
+            download_traces_batch(["abc123", "def456"], sample_timestamp)
+
+        assert exc_info.value.status_code == 500
+
+
+class TestTraceSession:
+    """Test cases for the TraceSession class."""
+
+    def test_requires_context_manager(self, sample_icao, sample_timestamp) -> None:
+        """Test that downloading outside of the context manager fails."""
+        with pytest.raises(RuntimeError):
+            TraceSession().download_traces(sample_icao, sample_timestamp)
+
+    def test_one_session_per_thread_sharing_a_pool(self) -> None:
+        """Test that each thread gets its own session, all mounted on the same adapter."""
+        with TraceSession() as trace_session:
+            main_session = trace_session._get_session()
+            assert trace_session._get_session() is main_session
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                thread_session = executor.submit(trace_session._get_session).result()
+
+            assert thread_session is not main_session
+            url = ADSBEXCHANGE_HISTORICAL_DATA_URL
+            assert thread_session.get_adapter(url) is main_session.get_adapter(url)
+            assert main_session.headers["Referer"] == "https://globe.adsbexchange.com/"
+
+        assert trace_session._sessions == []
+
+    def test_download_traces_uses_thread_session(self, sample_icao, sample_timestamp, mock_successful_response):
+        """Test that downloads go through the session of the calling thread."""
+        with TraceSession(timeout=5.0) as trace_session:
+            with patch.object(requests.Session, "get", return_value=mock_successful_response) as mock_get:
+                result = trace_session.download_traces(sample_icao, sample_timestamp)
+
+        assert result == mock_successful_response.content
+        expected_url = f"{ADSBEXCHANGE_HISTORICAL_DATA_URL}2023/06/15/traces/23/trace_full_abc123.json"
+        mock_get.assert_called_once_with(expected_url, timeout=5.0)
+
+
 class TestConstants:
     """Test cases for module constants."""
 
@@ -290,6 +519,381 @@ class TestHaversineDistance:
         assert distance == pytest.approx(10_000_000, rel=0.02)
 
 
+class TestHaversineDistanceBatch:
+    """Test cases for the haversine_distance_batch function."""
+
+    def test_matches_scalar_haversine(self):
+        """Test that batched distances match the scalar implementation."""
+        paris = (48.8566, 2.3522)
+        points = [(51.5074, -0.1278), (40.7128, -74.0060), (48.8566, 2.3522), (-33.8688, 151.2093)]
+
+        distances = haversine_distance_batch([p[0] for p in points], [p[1] for p in points], paris)
+
+        assert distances.shape == (len(points),)
+        for distance, point in zip(distances, points, strict=True):
+            assert distance == pytest.approx(haversine_distance(paris, point), abs=1e-6)
+
+    def test_empty_input(self):
+        """Test that empty inputs return an empty array."""
+        distances = haversine_distance_batch([], [], (48.8566, 2.3522))
+        assert distances.shape == (0,)
+
+    def test_haversine_distance_accepts_coordinate_array(self):
+        """Test that haversine_distance returns one distance per row of an (N, 2) array."""
+        paris = (48.8566, 2.3522)
+        points = np.array([(51.5074, -0.1278), (40.7128, -74.0060), (48.8566, 2.3522)])
+
+        distances = haversine_distance(paris, points)
+
+        assert distances.shape == (3,)
+        for distance, point in zip(distances, points, strict=True):
+            assert distance == pytest.approx(haversine_distance(paris, (point[0], point[1])), abs=1e-6)
+
+
+class TestGetHeatmapEntries:
+    """Test cases for the get_heatmap_entries function."""
+
+    def test_entries_carry_callsign_and_timestamp(self):
+        """Test that heat entries are enriched with the preceding callsign and timestamp separator."""
+        separator_time = datetime(2023, 6, 15, 14, 40, tzinfo=UTC)
+        decoded = [
+            HeatmapDecoder.CallsignEntry("abc123", "TEST123"),
+            HeatmapDecoder.HeatEntry("abc123", 48.8566, 2.3522, 35000, 450.5),
+            HeatmapDecoder.TimestampSeparator(separator_time, b""),
+            HeatmapDecoder.HeatEntry("def456", 51.5074, -0.1278, "ground", None),
+        ]
+
+        with patch("src.py_adsb_historical_data_client.historical.get_heatmap", return_value=iter(decoded)):
+            entries = list(get_heatmap_entries(datetime(2023, 6, 15, 14, 45)))
+
+        assert len(entries) == 2
+        assert entries[0].timestamp == datetime(2023, 6, 15, 14, 30)
+        assert entries[0].callsign == "TEST123"
+        assert (entries[0].hex_id, entries[0].lat, entries[0].lon) == ("abc123", 48.8566, 2.3522)
+        assert (entries[0].alt, entries[0].ground_speed) == (35000, 450.5)
+        assert entries[1].timestamp == separator_time
+        assert entries[1].callsign is None
+        assert entries[1].alt == "ground"
+
+
+class TestGetHeatmapBatch:
+    """Test cases for the get_heatmap_batch function and FullHeatmapBatch."""
+
+    @staticmethod
+    def _separator(timestamp: datetime, byte_order: str = "<") -> bytes:
+        ms = int(timestamp.timestamp() * 1000)
+        return struct.pack(f"{byte_order}III4x", HeatmapDecoder.MAGIC_NUMBER, ms >> 32, ms & 0xFFFFFFFF)
+
+    @staticmethod
+    def _callsign(hex_id: str, callsign: str, byte_order: str = "<") -> bytes:
+        return struct.pack(f"{byte_order}Ii8s", int(hex_id, 16), 1 << 30, callsign.encode())
+
+    @staticmethod
+    def _heat(hex_id: str, lat: float, lon: float, alt: int, gs: int, byte_order: str = "<") -> bytes:
+        return struct.pack(f"{byte_order}IiihH", int(hex_id, 16), round(lat * 1e6), round(lon * 1e6), alt, gs)
+
+    @classmethod
+    def _raw(cls, byte_order: str = "<") -> bytes:
+        return b"".join(
+            [
+                cls._callsign("abc123", "TEST123", byte_order),
+                cls._heat("abc123", 48.8566, 2.3522, 1400, 4505, byte_order),
+                cls._separator(datetime(2023, 6, 15, 14, 40, tzinfo=UTC), byte_order),
+                cls._heat("def456", 51.5074, -0.1278, -123, 0xFFFF, byte_order),
+                cls._heat("abc123", 48.8600, 2.3500, 1360, 4400, byte_order),
+                cls._heat("fed789", 40.7128, -74.0060, -124, 1200, byte_order),
+            ]
+        )
+
+    def test_batch_columns(self):
+        """Test that heat entries are stored column-wise with their callsign and timestamp."""
+        with patch("src.py_adsb_historical_data_client.historical.download_heatmap", return_value=self._raw()):
+            batch = get_heatmap_batch(datetime(2023, 6, 15, 14, 45))
+
+        assert len(batch) == 4
+        assert batch.hex_ids.tolist() == ["abc123", "def456", "abc123", "fed789"]
+        assert batch.callsigns.tolist() == ["TEST123", "", "TEST123", ""]
+        assert batch.timestamps.tolist() == [
+            datetime(2023, 6, 15, 14, 30),
+            datetime(2023, 6, 15, 14, 40),
+            datetime(2023, 6, 15, 14, 40),
+            datetime(2023, 6, 15, 14, 40),
+        ]
+        assert batch.lat.tolist() == [48.8566, 51.5074, 48.8600, 40.7128]
+        assert batch.alt.dtype == np.float32
+        assert batch.alt[:3].tolist() == [35000.0, 0.0, 34000.0]
+        assert np.isnan(batch.alt[3])
+        assert batch.is_ground.tolist() == [False, True, False, False]
+        assert np.isnan(batch.ground_speed[1])
+        assert batch.ground_speed[[0, 2, 3]].tolist() == pytest.approx([450.5, 440.0, 120.0])
+
+    def test_big_endian_heatmap(self):
+        """Test that the byte order is detected from the separators."""
+        with patch("src.py_adsb_historical_data_client.historical.download_heatmap", return_value=self._raw()):
+            little = get_heatmap_batch(datetime(2023, 6, 15, 14, 45))
+        with patch("src.py_adsb_historical_data_client.historical.download_heatmap", return_value=self._raw(">")):
+            big = get_heatmap_batch(datetime(2023, 6, 15, 14, 45))
+
+        assert big.hex_ids.tolist() == little.hex_ids.tolist()
+        assert big.timestamps.tolist() == little.timestamps.tolist()
+        assert big.lat_e6.tolist() == little.lat_e6.tolist()
+        assert big.is_ground.tolist() == little.is_ground.tolist()
+
+    def test_callsigns_follow_their_aircraft(self):
+        """Test that callsigns use all 8 bytes and only apply to later entries of the same aircraft."""
+        data = b"".join(
+            [
+                self._heat("abc123", -33.8688, 151.2093, 400, 3000),
+                self._callsign("abc123", "QFA12345"),
+                self._callsign("def456", "BAW1"),
+                self._heat("abc123", -33.8700, 151.2100, 400, 3000),
+                self._callsign("abc123", "QFA1"),
+                self._heat("def456", -34.0, 151.0, 400, 3000),
+                self._heat("abc123", -33.8710, 151.2110, 400, 3000),
+            ]
+        )
+        with patch("src.py_adsb_historical_data_client.historical.download_heatmap", return_value=data):
+            batch = get_heatmap_batch(datetime(2023, 6, 15, 14, 45))
+
+        # Southern latitudes are positions, not callsign records
+        assert batch.lat_e6.tolist() == [-33868800, -33870000, -34000000, -33871000]
+        assert batch.callsigns.tolist() == ["", "QFA12345", "BAW1", "QFA1"]
+
+    def test_batch_from_cached_file_without_download(self, tmp_path: Path):
+        """Test that a cached heatmap is parsed from its memory map."""
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        # Stored by another instance, so the heatmap is only on disk
+        Cache(tmp_path / "cache").put_heatmap(timestamp, self._raw())
+        try:
+            set_cache(tmp_path / "cache")
+
+            with patch("src.py_adsb_historical_data_client.historical.download_heatmap") as mock_download:
+                batch = get_heatmap_batch(timestamp)
+
+            mock_download.assert_not_called()
+        finally:
+            disable_cache()
+
+        assert batch.hex_ids.tolist() == ["abc123", "def456", "abc123", "fed789"]
+
+    def test_batch_parse_error_from_cached_file_is_raised(self, tmp_path: Path):
+        """Test that a parse failure on a memory-mapped heatmap surfaces instead of a BufferError."""
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        Cache(tmp_path / "cache").put_heatmap(timestamp, self._raw())
+
+        def failing_parse(data, timestamp):
+            records = np.frombuffer(data, dtype=np.uint8)  # noqa: F841 - kept alive by the traceback
+            raise ValueError("corrupt heatmap")
+
+        try:
+            set_cache(tmp_path / "cache")
+            with patch("src.py_adsb_historical_data_client.historical._parse_heatmap_batch", side_effect=failing_parse):
+                with pytest.raises(ValueError, match="corrupt heatmap"):
+                    get_heatmap_batch(timestamp)
+        finally:
+            disable_cache()
+
+    def test_batch_from_memory_cache(self, tmp_path: Path):
+        """Test that a heatmap held in the cache's memory layer is parsed without reading the disk."""
+        timestamp = datetime(2023, 6, 15, 14, 45)
+        try:
+            cache = set_cache(tmp_path / "cache")
+            cache.put_heatmap(timestamp, self._raw())
+            (tmp_path / "cache" / "heatmaps" / "2023" / "06" / "15" / "29.bin.ttf").unlink()
+
+            with patch("src.py_adsb_historical_data_client.historical.download_heatmap") as mock_download:
+                batch = get_heatmap_batch(timestamp)
+
+            mock_download.assert_not_called()
+        finally:
+            disable_cache()
+
+        assert batch.hex_ids.tolist() == ["abc123", "def456", "abc123", "fed789"]
+
+    def test_batch_entries_and_take(self):
+        """Test rebuilding entries from a batch and selecting a subset of it."""
+        with patch("src.py_adsb_historical_data_client.historical.download_heatmap", return_value=self._raw()):
+            batch = get_heatmap_batch(datetime(2023, 6, 15, 14, 45))
+
+        entry = batch[1]
+        assert isinstance(entry, FullHeatmapEntry)
+        assert entry.timestamp == datetime(2023, 6, 15, 14, 40, tzinfo=UTC)
+        assert (entry.hex_id, entry.callsign, entry.alt, entry.ground_speed) == ("def456", None, "ground", None)
+        assert (batch[0].alt, batch[3].alt) == (35000, None)
+
+        nearby = batch.take(is_valid_location((48.8566, 2.3522), 1000, np.column_stack((batch.lat, batch.lon))))
+        assert [e.hex_id for e in nearby] == ["abc123", "abc123"]
+        assert [e.callsign for e in nearby] == ["TEST123", "TEST123"]
+
+    def test_coordinates_stored_as_microdegrees(self):
+        """Test that int32 coordinates keep the stored microdegrees exactly."""
+        with patch("src.py_adsb_historical_data_client.historical.download_heatmap", return_value=self._raw()):
+            batch = get_heatmap_batch(datetime(2023, 6, 15, 14, 45))
+
+        assert batch.lat_e6.dtype == np.int32
+        assert batch.lat_e6.tolist() == [48856600, 51507400, 48860000, 40712800]
+        assert batch.lon.tolist() == [2.3522, -0.1278, 2.35, -74.006]
+        assert batch[1].lon == -0.1278
+        assert batch.coslat.tolist() == np.cos(np.radians(batch.lat)).tolist()
+        assert batch.take(np.array([2, 0])).coslat.tolist() == batch.coslat[[2, 0]].tolist()
+
+    @pytest.mark.parametrize("radius", [1000, 5000, 40_000, 400_000])
+    @pytest.mark.parametrize("center", [(60.0, 10.0), (0.0, 179.99)])
+    def test_within_matches_haversine(self, center, radius):
+        """Test that the within mask agrees with haversine_distance, including across the antimeridian."""
+        coordinates = [
+            (center[0] + dlat, (center[1] + dlon + 180.0) % 360.0 - 180.0)
+            for dlat in (-3.6, -0.36, -0.1, 0.005, 0.2, 0.3587)
+            for dlon in (-0.7, 0.01, 0.02, 0.3, 6.0)
+        ]
+        data = b"".join(self._heat("abc123", lat, lon, 40, 1000) for lat, lon in coordinates)
+        with patch("src.py_adsb_historical_data_client.historical.download_heatmap", return_value=data):
+            batch = get_heatmap_batch(datetime(2023, 6, 15, 14, 45))
+
+        expected = [haversine_distance(center, coordinate) <= radius for coordinate in coordinates]
+        assert batch.within(*center, radius).tolist() == expected
+
+    def test_batches_compare_by_identity(self):
+        """Test that batches can be hashed and compared without comparing their arrays."""
+        with patch("src.py_adsb_historical_data_client.historical.download_heatmap", return_value=self._raw()):
+            batch = get_heatmap_batch(datetime(2023, 6, 15, 14, 45))
+        other = batch.take(np.arange(len(batch)))
+
+        assert batch == batch
+        assert batch != other
+        assert len({batch, other}) == 2
+
+    def test_empty_heatmap(self):
+        """Test that an empty heatmap gives an empty batch."""
+        with patch("src.py_adsb_historical_data_client.historical.download_heatmap", return_value=b""):
+            batch = get_heatmap_batch(datetime(2023, 6, 15, 14, 45))
+
+        assert len(batch) == 0
+        assert batch.timestamps.shape == (0,)
+
+
+class TestGetZonedHeatmapEntries:
+    """Test cases for the get_zoned_heatmap_entries function."""
+
+    @staticmethod
+    def _entry(lat: float, lon: float, hex_id: str = "abc123") -> FullHeatmapEntry:
+        return FullHeatmapEntry(
+            timestamp=None,
+            callsign=None,
+            hex_id=hex_id,
+            lat=lat,
+            lon=lon,
+            alt=35000,
+            ground_speed=450.5,
+        )
+
+    def test_filters_entries_outside_radius(self, sample_timestamp):
+        """Test that only entries within the radius are yielded, in order."""
+        entries = [
+            self._entry(48.8600, 2.3500, "inside1"),  # ~400 m from Paris center
+            self._entry(51.5074, -0.1278, "london"),  # ~343 km away
+            self._entry(48.9466, 2.3522, "edge"),  # ~10 km north
+            self._entry(48.8566, 2.3522, "inside2"),  # Paris center
+        ]
+
+        with patch(
+            "src.py_adsb_historical_data_client.historical.get_heatmap_entries",
+            return_value=iter(entries),
+        ):
+            result = list(get_zoned_heatmap_entries(sample_timestamp, 48.8566, 2.3522, 1000))
+
+        assert [entry.hex_id for entry in result] == ["inside1", "inside2"]
+
+    def test_filters_large_radius_with_haversine(self, sample_timestamp):
+        """Test filtering with a radius above the equirectangular approximation range."""
+        entries = [
+            self._entry(51.5074, -0.1278, "london"),  # ~343 km from Paris
+            self._entry(52.5200, 13.4050, "berlin"),  # ~878 km from Paris
+        ]
+
+        with patch(
+            "src.py_adsb_historical_data_client.historical.get_heatmap_entries",
+            return_value=iter(entries),
+        ):
+            result = list(get_zoned_heatmap_entries(sample_timestamp, 48.8566, 2.3522, 400_000))
+
+        assert [entry.hex_id for entry in result] == ["london"]
+
+    def test_small_radius_matches_haversine(self, sample_timestamp):
+        """Test that the equirectangular filter agrees with haversine_distance for small radii."""
+        center = (60.0, 10.0)
+        radius = 40_000
+        entries = [self._entry(60.0 + dlat, 10.0 + dlon) for dlat in (-0.36, -0.1, 0.2, 0.3587) for dlon in (-0.7, 0.3)]
+
+        with patch(
+            "src.py_adsb_historical_data_client.historical.get_heatmap_entries",
+            return_value=iter(entries),
+        ):
+            result = list(get_zoned_heatmap_entries(sample_timestamp, *center, radius))
+
+        expected = [entry for entry in entries if haversine_distance(center, (entry.lat, entry.lon)) <= radius]
+        assert result == expected
+
+    def test_bounding_box_keeps_entries_near_the_radius(self, sample_timestamp):
+        """Test that entries just inside the radius due north or east are not rejected by the bounding box."""
+        center = (48.8566, 2.3522)
+        radius = 100_000
+        north = radius * 0.9999 / 111194.93
+        entries = [
+            self._entry(center[0] + north, center[1], "north"),
+            self._entry(center[0], center[1] + north / math.cos(math.radians(center[0])), "east"),
+        ]
+
+        with patch(
+            "src.py_adsb_historical_data_client.historical.get_heatmap_entries",
+            return_value=iter(entries),
+        ):
+            result = list(get_zoned_heatmap_entries(sample_timestamp, *center, radius))
+
+        assert [entry.hex_id for entry in result] == ["north", "east"]
+
+    def test_zone_across_antimeridian(self, sample_timestamp):
+        """Test that zones centered next to the antimeridian include entries on its other side."""
+        entries = [self._entry(-17.0, -179.99, "fiji_east"), self._entry(-17.0, 179.0, "far")]
+
+        with patch(
+            "src.py_adsb_historical_data_client.historical.get_heatmap_entries",
+            return_value=iter(entries),
+        ):
+            result = list(get_zoned_heatmap_entries(sample_timestamp, -17.0, 179.99, 5000))
+
+        assert [entry.hex_id for entry in result] == ["fiji_east"]
+
+    def test_large_radius_matches_haversine(self, sample_timestamp):
+        """Test that the haversine threshold agrees with haversine_distance around the radius."""
+        center = (48.8566, 2.3522)
+        radius = 343_000
+        entries = [self._entry(51.5074 + dlat, -0.1278 + dlon) for dlat in (-0.01, 0.0, 0.01) for dlon in (-0.01, 0.01)]
+
+        with patch(
+            "src.py_adsb_historical_data_client.historical.get_heatmap_entries",
+            return_value=iter(entries),
+        ):
+            result = list(get_zoned_heatmap_entries(sample_timestamp, *center, radius))
+
+        expected = [entry for entry in entries if haversine_distance(center, (entry.lat, entry.lon)) <= radius]
+        assert 0 < len(expected) < len(entries)
+        assert result == expected
+        assert 0 < len(result) < len(entries)
+
+    def test_filters_across_multiple_chunks(self, sample_timestamp):
+        """Test that filtering is correct when entries span several vectorized chunks."""
+        entries = [self._entry(48.8566 + (i % 2) * 5.0, 2.3522, f"{i:06x}") for i in range(10_001)]
+
+        with patch(
+            "src.py_adsb_historical_data_client.historical.get_heatmap_entries",
+            return_value=iter(entries),
+        ):
+            result = list(get_zoned_heatmap_entries(sample_timestamp, 48.8566, 2.3522, 1000))
+
+        assert [entry.hex_id for entry in result] == [f"{i:06x}" for i in range(0, 10_001, 2)]
+
+
 class TestIsValidLocation:
     """Test cases for the is_valid_location function."""
 
@@ -321,6 +925,42 @@ class TestIsValidLocation:
         assert is_valid_location(location, 0.001, location) is True  # Very small radius
         assert is_valid_location(location, 1_000_000, location) is True  # Large radius
 
+    def test_coordinate_array_matches_scalar(self):
+        """Test that the bounding box pre-filter keeps array results identical to scalar checks."""
+        center = (70.0, 179.9)
+        radius = 30_000
+        locations = np.array(
+            [(70.0 + dlat, lon) for dlat in (-0.3, -0.2695, 0.0, 0.1, 0.2695, 0.28) for lon in (179.5, -179.95, -179.3)]
+        )
+
+        mask = is_valid_location(center, radius, locations)
+
+        expected = [is_valid_location(center, radius, (lat, lon)) for lat, lon in locations]
+        assert mask.tolist() == expected
+        assert any(expected) and not all(expected)
+        # Points across the antimeridian are found
+        assert is_valid_location(center, radius, np.array([(70.0, -179.95)])).tolist() == [True]
+
+    def test_single_point_array_is_scalar(self):
+        """Test that a shape (2,) array, such as a row of an (N, 2) array, is checked as a single point."""
+        paris = (48.8566, 2.3522)
+        locations = np.array([(48.8600, 2.3500), (51.5074, -0.1278)])
+
+        assert is_valid_location(paris, 1000, locations[0]) is True
+        assert is_valid_location(paris, 1000, locations[1]) is False
+        assert haversine_distance(paris, locations[1]) == pytest.approx(haversine_distance(paris, (51.5074, -0.1278)))
+        assert isinstance(haversine_distance(paris, locations[1]), float)
+
+    def test_coordinate_array_returns_mask(self):
+        """Test that an (N, 2) array of locations yields a boolean mask."""
+        paris = (48.8566, 2.3522)
+        locations = np.array([(48.8600, 2.3500), (51.5074, -0.1278), (48.8566, 2.3522)])
+
+        mask = is_valid_location(paris, 1000, locations)
+
+        assert mask.dtype == np.bool_
+        assert mask.tolist() == [True, False, True]
+
 
 class TestFullHeatmapEntry:
     """Test cases for the FullHeatmapEntry class."""
@@ -376,6 +1016,20 @@ class TestFullHeatmapEntry:
 
         assert entry.alt == "ground"
 
+    def test_full_heatmap_entry_has_no_instance_dict(self, sample_timestamp):
+        """Test that FullHeatmapEntry instances are slotted."""
+        entry = FullHeatmapEntry(
+            timestamp=sample_timestamp,
+            callsign="TEST123",
+            hex_id="ABC123",
+            lat=48.8566,
+            lon=2.3522,
+            alt=35000,
+            ground_speed=450.5,
+        )
+
+        assert not hasattr(entry, "__dict__")
+
     def test_full_heatmap_entry_repr(self, sample_timestamp):
         """Test the string representation of FullHeatmapEntry."""
         entry = FullHeatmapEntry(